@@ -3,8 +3,15 @@
 Check what's on the lander page that the auth redirects to
 """
 
+import socket
 import urllib.request
 
+# Only a preview of the page is needed, so never pull more than this
+MAX_PREVIEW_BYTES = 65536
+
+# Bound every blocking socket operation, including ones urlopen does not cover
+socket.setdefaulttimeout(10)
+
 def check_lander():
     """Check the lander page"""
     print("🛬 Testing Lander Page")
@@ -13,9 +20,12 @@ def check_lander():
     lander_url = "https://deepify.org/lander"
     try:
         with urllib.request.urlopen(lander_url, timeout=10) as response:
-            content = response.read().decode('utf-8')
+            raw = response.read(MAX_PREVIEW_BYTES)
+            content = raw.decode('utf-8', errors='replace')
             print(f"✅ Lander: {response.status} {response.reason}")
-            print(f"📄 Full content:\n{content}")
+            print(f"📄 Content:\n{content}")
+            if len(raw) == MAX_PREVIEW_BYTES:
+                print("... [truncated]")
                 
     except Exception as e:
         print(f"❌ Lander test failed: {e}")
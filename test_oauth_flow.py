@@ -3,11 +3,15 @@
 Test the OAuth flow to see if we can authenticate and then access MCP
 """
 
+import socket
 import urllib.request
 import urllib.error
 import urllib.parse
 import json
 
+# Bound every blocking socket operation, including ones urlopen does not cover
+socket.setdefaulttimeout(10)
+
 def test_oauth_flow():
     """Test the basic OAuth flow"""
     print("🔐 Testing OAuth Flow")
@@ -0,0 +1 @@
+# Examples package
\ No newline at end of file
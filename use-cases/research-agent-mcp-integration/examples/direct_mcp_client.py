@@ -6,29 +6,21 @@ This script tests the MCP client tools directly without the research agent,
 useful for debugging and understanding the MCP integration.
 
 Usage:
-    python direct_mcp_client.py
+    python -m examples.direct_mcp_client
 """
 
-import sys
 import asyncio
 import logging
-from pathlib import Path
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent / "src"))
-
-from config.settings import settings
-from tools.mcp_client import (
-    MCPClient, MCPClientConfig,
+from src.config.settings import get_settings
+from src.tools.mcp_client import MCPClient, MCPClientConfig, install_uvloop
+from src.tools.mcp_convenience import (
     parse_prp_via_mcp, create_task_via_mcp, create_documentation_via_mcp,
     list_tasks_via_mcp, get_project_status_via_mcp
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+_LOG_FMT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
 logger = logging.getLogger(__name__)
 
 
@@ -113,128 +105,119 @@ database integration, and deployment automation.
 """
 
 
-async def test_mcp_client():
-    """Test MCP client functionality"""
+async def test_mcp_client(client: MCPClient):
+    """Test MCP client functionality over an already-open client session"""
     
     print("🔧 Testing MCP Client Integration")
     print("=" * 50)
-    
-    # Configure MCP client
-    config = MCPClientConfig(
-        server_url=settings.mcp_server_url,
-        github_token=settings.github_token,
-        timeout=30
-    )
-    
-    print(f"📡 Connecting to MCP server: {config.server_url}")
+    print(f"📡 Connected to MCP server: {client.config.server_url}")
     
     try:
-        async with MCPClient(config) as client:
-            # Test 1: Discover available tools
-            print("\n1️⃣ Discovering available tools...")
-            tools = await client.discover_tools()
-            print(f"   Found {len(tools)} tools: {', '.join(tools)}")
-            
-            # Test 2: Parse sample PRP
-            print("\n2️⃣ Testing PRP parsing...")
-            project_name = "fastapi-microservices-test"
-            
-            try:
-                parse_result = await parse_prp_via_mcp(
-                    client,
-                    SAMPLE_PRP,
-                    project_name=project_name
-                )
-                
-                print(f"   ✅ PRP parsed successfully")
-                if "content" in parse_result:
-                    content = parse_result["content"][0]["text"]
-                    # Extract key metrics from response
-                    lines = content.split('\n')
-                    for line in lines[:10]:  # Show first 10 lines
-                        if line.strip():
-                            print(f"      {line.strip()}")
-                    if len(lines) > 10:
-                        print(f"      ... ({len(lines)-10} more lines)")
-                
-            except Exception as e:
-                print(f"   ❌ PRP parsing failed: {e}")
-            
-            # Test 3: Create a sample task manually
-            print("\n3️⃣ Testing task creation...")
-            
-            try:
-                task_result = await create_task_via_mcp(
-                    client,
-                    title="Test MCP Integration",
-                    description="Verify that MCP client can create tasks successfully",
-                    project_name=project_name,
-                    priority="high",
-                    estimated_hours=2,
-                    tags=["testing", "integration", "mcp"]
-                )
-                
-                print(f"   ✅ Task created successfully")
-                if "content" in task_result:
-                    print(f"      Response: {task_result['content'][0]['text'][:100]}...")
-                
-            except Exception as e:
-                print(f"   ❌ Task creation failed: {e}")
-            
-            # Test 4: List tasks for the project
-            print("\n4️⃣ Testing task listing...")
-            
-            try:
-                tasks_result = await list_tasks_via_mcp(
-                    client,
-                    project_name=project_name,
-                    limit=10
-                )
-                
-                print(f"   ✅ Tasks listed successfully")
-                if "content" in tasks_result:
-                    print(f"      Response: {tasks_result['content'][0]['text'][:100]}...")
-                
-            except Exception as e:
-                print(f"   ❌ Task listing failed: {e}")
-            
-            # Test 5: Create sample documentation
-            print("\n5️⃣ Testing documentation creation...")
-            
-            try:
-                doc_result = await create_documentation_via_mcp(
-                    client,
-                    title="MCP Integration Guide",
-                    content="This documentation was created via MCP client to test the integration.",
-                    doc_type="guide",
-                    project_name=project_name,
-                    importance="medium",
-                    tags=["integration", "testing"]
-                )
-                
-                print(f"   ✅ Documentation created successfully")
-                if "content" in doc_result:
-                    print(f"      Response: {doc_result['content'][0]['text'][:100]}...")
-                
-            except Exception as e:
-                print(f"   ❌ Documentation creation failed: {e}")
+        # Test 1: Discover available tools
+        print("\n1️⃣ Discovering available tools...")
+        tools = await client.discover_tools()
+        print(f"   Found {len(tools)} tools: {', '.join(tools)}")
+        
+        # Test 2: Parse sample PRP
+        print("\n2️⃣ Testing PRP parsing...")
+        project_name = "fastapi-microservices-test"
+        
+        try:
+            parse_result = await parse_prp_via_mcp(
+                client,
+                SAMPLE_PRP,
+                project_name=project_name
+            )
             
-            # Test 6: Get project status
-            print("\n6️⃣ Testing project status retrieval...")
+            print(f"   ✅ PRP parsed successfully")
+            if "content" in parse_result:
+                content = parse_result["content"][0]["text"]
+                # Extract key metrics from response
+                lines = content.split('\n')
+                for line in lines[:10]:  # Show first 10 lines
+                    if line.strip():
+                        print(f"      {line.strip()}")
+                if len(lines) > 10:
+                    print(f"      ... ({len(lines)-10} more lines)")
             
-            try:
-                status_result = await get_project_status_via_mcp(client, project_name)
-                
-                print(f"   ✅ Project status retrieved")
-                print(f"      Project: {status_result.get('project_name', 'Unknown')}")
-                print(f"      Status: {status_result.get('status', 'Unknown')}")
-                
-                if "tasks" in status_result and "content" in status_result["tasks"]:
-                    print(f"      Tasks data available: Yes")
-                
-            except Exception as e:
-                print(f"   ❌ Project status retrieval failed: {e}")
+        except Exception as e:
+            print(f"   ❌ PRP parsing failed: {e}")
+        
+        # Tests 3-6 only depend on the project created in Test 2, so they are
+        # issued concurrently over the shared session instead of one by one
+        print("\n3️⃣-6️⃣ Running task, documentation and status tests concurrently...")
+        
+        task_result, tasks_result, doc_result, status_result = await asyncio.gather(
+            create_task_via_mcp(
+                client,
+                title="Test MCP Integration",
+                description="Verify that MCP client can create tasks successfully",
+                project_name=project_name,
+                priority="high",
+                estimated_hours=2,
+                tags=["testing", "integration", "mcp"]
+            ),
+            list_tasks_via_mcp(
+                client,
+                project_name=project_name,
+                limit=10
+            ),
+            create_documentation_via_mcp(
+                client,
+                title="MCP Integration Guide",
+                content="This documentation was created via MCP client to test the integration.",
+                doc_type="guide",
+                project_name=project_name,
+                importance="medium",
+                tags=["integration", "testing"]
+            ),
+            get_project_status_via_mcp(client, project_name),
+            return_exceptions=True
+        )
+        
+        # Test 3: Create a sample task manually
+        print("\n3️⃣ Testing task creation...")
+        
+        if isinstance(task_result, Exception):
+            print(f"   ❌ Task creation failed: {task_result}")
+        else:
+            print(f"   ✅ Task created successfully")
+            if "content" in task_result:
+                print(f"      Response: {task_result['content'][0]['text'][:100]}...")
         
+        # Test 4: List tasks for the project
+        print("\n4️⃣ Testing task listing...")
+        
+        if isinstance(tasks_result, Exception):
+            print(f"   ❌ Task listing failed: {tasks_result}")
+        else:
+            print(f"   ✅ Tasks listed successfully")
+            if "content" in tasks_result:
+                print(f"      Response: {tasks_result['content'][0]['text'][:100]}...")
+        
+        # Test 5: Create sample documentation
+        print("\n5️⃣ Testing documentation creation...")
+        
+        if isinstance(doc_result, Exception):
+            print(f"   ❌ Documentation creation failed: {doc_result}")
+        else:
+            print(f"   ✅ Documentation created successfully")
+            if "content" in doc_result:
+                print(f"      Response: {doc_result['content'][0]['text'][:100]}...")
+        
+        # Test 6: Get project status
+        print("\n6️⃣ Testing project status retrieval...")
+        
+        if isinstance(status_result, Exception):
+            print(f"   ❌ Project status retrieval failed: {status_result}")
+        else:
+            print(f"   ✅ Project status retrieved")
+            print(f"      Project: {status_result.get('project_name', 'Unknown')}")
+            print(f"      Status: {status_result.get('status', 'Unknown')}")
+            
+            if "tasks" in status_result and "content" in status_result["tasks"]:
+                print(f"      Tasks data available: Yes")
+    
         print("\n🎉 MCP Client Testing Complete!")
         print("\n💡 Next Steps:")
         print("   - Check your MCP server database for the created data")
@@ -251,24 +234,18 @@ async def test_mcp_client():
         print("   4. Check network connectivity to MCP server")
 
 
-async def test_tool_discovery():
+async def test_tool_discovery(client: MCPClient):
     """Test just the tool discovery to verify basic connection"""
     
     print("🔍 Quick Connection Test")
     print("=" * 30)
     
-    config = MCPClientConfig(
-        server_url=settings.mcp_server_url,
-        github_token=settings.github_token
-    )
-    
     try:
-        async with MCPClient(config) as client:
-            tools = await client.discover_tools()
-            print(f"✅ Connected to MCP server")
-            print(f"📦 Available tools ({len(tools)}):")
-            for tool in tools:
-                print(f"   - {tool}")
+        tools = await client.discover_tools()
+        print(f"✅ Connected to MCP server")
+        print(f"📦 Available tools ({len(tools)}):")
+        for tool in tools:
+            print(f"   - {tool}")
         
         return True
         
@@ -280,7 +257,13 @@ async def test_tool_discovery():
 async def main():
     """Main test execution"""
     
+    # Configure logging only when running as the entry point, and never on top
+    # of a host application's (or test harness's) existing handlers
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format=_LOG_FMT)
+    
     # Validate configuration
+    settings = get_settings()
     if not settings.mcp_server_url:
         print("❌ MCP_SERVER_URL not configured")
         print("Please set MCP_SERVER_URL in your .env file")
@@ -290,21 +273,31 @@ async def main():
     print("This script tests the MCP integration without the research agent.")
     print()
     
-    # Quick connection test first
-    connected = await test_tool_discovery()
-    
-    if not connected:
-        print("\n🔧 Setup Instructions:")
-        print("1. Start your MCP server: cd ../mcp-server/deepify-mcp-server && wrangler dev")
-        print("2. Configure .env file with MCP_SERVER_URL and GITHUB_TOKEN")
-        print("3. Ensure GitHub OAuth is set up correctly")
-        return
-    
-    print()
+    config = MCPClientConfig(
+        server_url=settings.mcp_server_url,
+        github_token=settings.github_token,
+        timeout=30
+    )
     
-    # Full test suite
-    await test_mcp_client()
+    # One client session for the whole run: the connection test and the full
+    # suite share a single MCP handshake and keep-alive connection
+    async with MCPClient(config) as client:
+        # Quick connection test first
+        connected = await test_tool_discovery(client)
+        
+        if not connected:
+            print("\n🔧 Setup Instructions:")
+            print("1. Start your MCP server: cd ../mcp-server/deepify-mcp-server && wrangler dev")
+            print("2. Configure .env file with MCP_SERVER_URL and GITHUB_TOKEN")
+            print("3. Ensure GitHub OAuth is set up correctly")
+            return
+        
+        print()
+        
+        # Full test suite
+        await test_mcp_client(client)
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
\ No newline at end of file
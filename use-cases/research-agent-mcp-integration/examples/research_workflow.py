@@ -6,27 +6,16 @@ This script demonstrates the full integration between the Pydantic AI Research A
 and the Deepify MCP Server to create projects from research.
 
 Usage:
-    python research_workflow.py "Research Next.js 15 and create a project plan"
-    python research_workflow.py "Research FastAPI best practices for microservices"
+    python -m examples.research_workflow "Research Next.js 15 and create a project plan"
+    python -m examples.research_workflow "Research FastAPI best practices for microservices"
 """
 
 import sys
 import asyncio
 import logging
-from pathlib import Path
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+_LOG_FMT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-from config.settings import settings
-from agents.research_agent import conduct_research_and_create_project, ResearchAgentDependencies
-from models.research_models import ResearchRequest
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
@@ -35,13 +24,21 @@ async def main():
     
     # Check for command line argument
     if len(sys.argv) < 2:
-        print("Usage: python research_workflow.py \"Research topic and create project\"")
+        print("Usage: python -m examples.research_workflow \"Research topic and create project\"")
         print("\nExamples:")
-        print("  python research_workflow.py \"Research Next.js 15 and create a project plan\"")
-        print("  python research_workflow.py \"Research FastAPI best practices for microservices\"")
-        print("  python research_workflow.py \"Research Rust web frameworks and create comparison project\"")
+        print("  python -m examples.research_workflow \"Research Next.js 15 and create a project plan\"")
+        print("  python -m examples.research_workflow \"Research FastAPI best practices for microservices\"")
+        print("  python -m examples.research_workflow \"Research Rust web frameworks and create comparison project\"")
         return
     
+    # Imported here so the usage/help path doesn't pay for loading settings,
+    # Pydantic AI, the model clients and the search/MCP tooling
+    from src.config.settings import get_settings
+    from src.agents.research_agent import (
+        conduct_research_and_create_project, ResearchAgentDependencies, close_mcp_clients
+    )
+    from src.models.research_models import ResearchRequest
+    
     research_topic = sys.argv[1]
     
     print(f"🔍 Starting research workflow for: {research_topic}")
@@ -49,12 +46,18 @@ async def main():
     
     # Validate configuration
     try:
-        if not settings.brave_api_key:
-            raise ValueError("BRAVE_API_KEY not configured")
-        if not settings.anthropic_api_key:
-            raise ValueError("ANTHROPIC_API_KEY not configured")
-        if not settings.mcp_server_url:
-            raise ValueError("MCP_SERVER_URL not configured")
+        # Loading settings raises a ValueError subclass if required values are missing
+        settings = get_settings()
+        
+        # Check everything in one pass so all missing keys are reported together
+        required = (
+            ("BRAVE_API_KEY", settings.brave_api_key),
+            ("ANTHROPIC_API_KEY", settings.anthropic_api_key),
+            ("MCP_SERVER_URL", settings.mcp_server_url),
+        )
+        missing = [name for name, value in required if not value]
+        if missing:
+            raise ValueError(f"Not configured: {', '.join(missing)}")
         
         print(f"✅ Configuration validated")
         print(f"   - MCP Server: {settings.mcp_server_url}")
@@ -67,6 +70,11 @@ async def main():
         print("Please check your .env file and ensure all required variables are set.")
         return
     
+    # Configure logging only when running as the entry point, and never on top
+    # of a host application's (or test harness's) existing handlers
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=getattr(logging, settings.log_level, logging.INFO), format=_LOG_FMT)
+    
     # Create research request
     request = ResearchRequest(
         topic=research_topic,
@@ -100,52 +108,64 @@ async def main():
         # Execute the complete workflow
         response = await conduct_research_and_create_project(request, dependencies)
         
-        # Display results
-        print("🎉 Research Workflow Complete!")
-        print("=" * 80)
+        # Display results: build the whole report and write it in one call
+        buf = [
+            "🎉 Research Workflow Complete!",
+            "=" * 80,
+        ]
         
         if response.success:
-            print(f"✅ **Project Created Successfully**")
-            print(f"   - Session ID: {response.session_id}")
-            print(f"   - Project Name: {response.project_name or 'Generated from topic'}")
-            print(f"   - Search Results Analyzed: {response.search_results_count}")
-            print(f"   - PRP Generated: {'Yes' if response.prp_generated else 'No'}")
-            print(f"   - PRP Parsed by MCP: {'Yes' if response.prp_parsed else 'No'}")
-            print(f"   - Tasks Created: {response.tasks_created}")
-            print(f"   - Documentation Created: {response.documentation_created}")
+            buf += [
+                f"✅ **Project Created Successfully**",
+                f"   - Session ID: {response.session_id}",
+                f"   - Project Name: {response.project_name or 'Generated from topic'}",
+                f"   - Search Results Analyzed: {response.search_results_count}",
+                f"   - PRP Generated: {'Yes' if response.prp_generated else 'No'}",
+                f"   - PRP Parsed by MCP: {'Yes' if response.prp_parsed else 'No'}",
+                f"   - Tasks Created: {response.tasks_created}",
+                f"   - Documentation Created: {response.documentation_created}",
+            ]
             
             if response.estimated_hours:
-                print(f"   - Estimated Project Hours: {response.estimated_hours}")
+                buf.append(f"   - Estimated Project Hours: {response.estimated_hours}")
             
-            print()
-            print("📋 **Next Steps:**")
-            for i, step in enumerate(response.next_steps, 1):
-                print(f"   {i}. {step}")
+            buf += ["", "📋 **Next Steps:**"]
+            buf.extend(f"   {i}. {step}" for i, step in enumerate(response.next_steps, 1))
             
-            print()
-            print("🔗 **MCP Server Access:**")
-            print(f"   Your project data is now stored in the MCP server at: {settings.mcp_server_url}")
-            print(f"   You can query tasks, documentation, and project status using MCP tools.")
+            buf += [
+                "",
+                "🔗 **MCP Server Access:**",
+                f"   Your project data is now stored in the MCP server at: {settings.mcp_server_url}",
+                f"   You can query tasks, documentation, and project status using MCP tools.",
+            ]
             
         else:
-            print(f"❌ **Workflow Failed**")
-            print(f"   Error: {response.error_message}")
-            print(f"   Session ID: {response.session_id}")
+            buf += [
+                f"❌ **Workflow Failed**",
+                f"   Error: {response.error_message}",
+                f"   Session ID: {response.session_id}",
+            ]
             
             if response.search_results_count > 0:
-                print(f"   Note: {response.search_results_count} search results were found before failure")
+                buf.append(f"   Note: {response.search_results_count} search results were found before failure")
         
-        print()
-        print("🔧 **Integration Details:**")
-        print(f"   - Research Agent: Pydantic AI with {settings.default_model_provider}")
-        print(f"   - MCP Server: Deepify server at {settings.mcp_server_url}")
-        print(f"   - Database: PostgreSQL via MCP server")
-        print(f"   - Authentication: GitHub OAuth via MCP")
+        buf += [
+            "",
+            "🔧 **Integration Details:**",
+            f"   - Research Agent: Pydantic AI with {settings.default_model_provider}",
+            f"   - MCP Server: Deepify server at {settings.mcp_server_url}",
+            f"   - Database: PostgreSQL via MCP server",
+            f"   - Authentication: GitHub OAuth via MCP",
+        ]
+        sys.stdout.write("\n".join(buf) + "\n")
         
     except Exception as e:
         logger.error(f"Workflow execution failed: {e}")
         print(f"❌ **Unexpected Error**: {e}")
         print("Check the logs for detailed error information.")
+    finally:
+        # Shutdown hook for the MCP clients the agent tools kept open
+        await close_mcp_clients()
 
 
 def print_example_usage():
@@ -153,24 +173,27 @@ def print_example_usage():
     print("\n📚 **Example Research Topics:**")
     print()
     print("**Web Development:**")
-    print("  python research_workflow.py \"Research Next.js 15 features and create migration project\"")
-    print("  python research_workflow.py \"Research React Server Components best practices\"")
+    print("  python -m examples.research_workflow \"Research Next.js 15 features and create migration project\"")
+    print("  python -m examples.research_workflow \"Research React Server Components best practices\"")
     print()
     print("**Backend Development:**")
-    print("  python research_workflow.py \"Research FastAPI performance optimization techniques\"")
-    print("  python research_workflow.py \"Research microservices patterns with Python\"")
+    print("  python -m examples.research_workflow \"Research FastAPI performance optimization techniques\"")
+    print("  python -m examples.research_workflow \"Research microservices patterns with Python\"")
     print()
     print("**AI/ML:**")
-    print("  python research_workflow.py \"Research LangChain vs LlamaIndex for RAG applications\"")
-    print("  python research_workflow.py \"Research Pydantic AI agent deployment patterns\"")
+    print("  python -m examples.research_workflow \"Research LangChain vs LlamaIndex for RAG applications\"")
+    print("  python -m examples.research_workflow \"Research Pydantic AI agent deployment patterns\"")
     print()
     print("**DevOps:**")
-    print("  python research_workflow.py \"Research Kubernetes monitoring with Prometheus\"")
-    print("  python research_workflow.py \"Research GitHub Actions CI/CD best practices\"")
+    print("  python -m examples.research_workflow \"Research Kubernetes monitoring with Prometheus\"")
+    print("  python -m examples.research_workflow \"Research GitHub Actions CI/CD best practices\"")
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print_example_usage()
     else:
+        from src.tools.mcp_transport import install_uvloop
+        
+        install_uvloop()
         asyncio.run(main())
\ No newline at end of file
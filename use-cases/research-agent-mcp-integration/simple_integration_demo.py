@@ -6,49 +6,74 @@ This demonstrates the integration concept without complex dependencies.
 Shows how the research agent would connect to your production MCP server.
 """
 
+import asyncio
+import importlib.util
 import json
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
+import time
 
+import aiohttp
 
-def test_mcp_server_connection(server_url):
+try:
+    import orjson
+except ImportError:  # optional C parser for responses; fall back to the stdlib
+    orjson = None
+
+from config import RESEARCH_CONFIG
+
+# aiohttp only decompresses brotli when a decoder is installed
+ACCEPT_ENCODING = (
+    "br, gzip"
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi")
+    else "gzip"
+)
+
+# MCP tool discovery request; it never changes, so serialize it once
+_TOOLS_LIST_BODY: bytes = json.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "tools/list",
+    "params": {}
+}).encode('utf-8')
+
+# Successful discovery responses, reused until they expire:
+# (server_url, method) -> (expires_at, result)
+TOOLS_CACHE_TTL = 60
+_TOOLS_CACHE = {}
+
+
+async def test_mcp_server_connection(session, server_url, force_refresh=False):
     """Test basic connectivity to MCP server"""
     
     print(f"🔗 Testing connection to: {server_url}")
     
-    # MCP tool discovery request
-    mcp_request = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "tools/list",
-        "params": {}
-    }
+    cache_key = (server_url, "tools/list")
+    cached = _TOOLS_CACHE.get(cache_key)
+    if cached and not force_refresh and time.monotonic() < cached[0]:
+        return True, cached[1]
     
     try:
-        # Create HTTP request
-        data = json.dumps(mcp_request).encode('utf-8')
-        request = Request(
+        async with session.post(
             server_url + '/tools/list',
-            data=data,
+            data=_TOOLS_LIST_BODY,
             headers={
                 'Content-Type': 'application/json',
+                'Accept-Encoding': ACCEPT_ENCODING,
                 'User-Agent': 'Research-Agent-Demo/1.0'
             },
-            method='POST'
-        )
-        
-        # Make the request
-        with urlopen(request, timeout=10) as response:
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
             if response.status == 200:
-                result = json.loads(response.read().decode('utf-8'))
+                body = await response.read()
+                result = orjson.loads(body) if orjson else json.loads(body)
+                _TOOLS_CACHE[cache_key] = (time.monotonic() + TOOLS_CACHE_TTL, result)
                 return True, result
             else:
-                return False, f"HTTP {response.status}"
+                return False, f"HTTP Error {response.status}: {response.reason}"
                 
-    except HTTPError as e:
-        return False, f"HTTP Error {e.code}: {e.reason}"
-    except URLError as e:
-        return False, f"Connection Error: {e.reason}"
+    except aiohttp.ClientConnectionError as e:
+        return False, f"Connection Error: {e}"
+    except asyncio.TimeoutError:
+        return False, "Connection Error: timed out"
     except Exception as e:
         return False, f"Unexpected Error: {e}"
 
@@ -92,7 +117,7 @@ def demo_research_workflow():
 """)
 
 
-def demo_mcp_integration():
+async def demo_mcp_integration():
     """Demo the MCP integration concept"""
     
     print("\n🔧 MCP Integration Test")
@@ -104,10 +129,37 @@ def demo_mcp_integration():
         "https://your-deepify-worker.workers.dev/mcp"  # Production (replace with actual)
     ]
     
+    # Race every server over one pooled session and stop at the first one that
+    # answers, so a reachable local server never waits on the remote timeout
+    connector = aiohttp.TCPConnector(
+        limit=RESEARCH_CONFIG.max_concurrent_requests,
+        keepalive_timeout=30
+    )
+    results = {}
+    async with aiohttp.ClientSession(connector=connector) as session:
+        probes = {
+            asyncio.create_task(test_mcp_server_connection(session, url)): url
+            for url in test_urls
+        }
+        pending = set(probes)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results[probes[task]] = task.result()
+            if any(success for success, _ in results.values()):
+                break
+        
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
     for url in test_urls:
-        print(f"\n📡 Testing: {url}")
+        if url not in results:
+            print(f"\n📡 Skipped: {url} (another server already responded)")
+            continue
         
-        success, result = test_mcp_server_connection(url)
+        success, result = results[url]
+        print(f"\n📡 Testing: {url}")
         
         if success:
             print("✅ Connection successful!")
@@ -190,11 +242,11 @@ def demo_expected_workflow():
     print(f"🚀 Scalable: Ready for multiple research agents")
 
 
-def main():
+async def main():
     """Main demo execution"""
     
     demo_research_workflow()
-    demo_mcp_integration()
+    await demo_mcp_integration()
     demo_expected_workflow()
     
     print(f"\n" + "="*60)
@@ -207,4 +259,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -5,31 +5,97 @@ Intelligent research agent that combines web search, PRP generation,
 and MCP server integration to create complete project workflows.
 """
 
+import asyncio
 import logging
-import uuid
+import re
+import secrets
+import weakref
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from pydantic_ai import Agent, RunContext
 from pydantic import BaseModel
 
 from ..config.providers import get_llm_model
-from ..config.settings import settings
-from ..tools.web_search import WebSearchTool, WebSearchError
-from ..tools.prp_writer import PRPWriter, ResearchInput, PRPWriterError
-from ..tools.mcp_client import (
-    MCPClient, MCPClientConfig, MCPClientError,
-    parse_prp_via_mcp, create_task_via_mcp, create_documentation_via_mcp
+from ..config.settings import get_settings
+from ..tools.web_search import WebSearchError, get_web_search_tool, close_web_search_tools
+from ..tools.prp_writer import PRPWriter, ResearchInput, PRPWriterError, close_anthropic_clients
+from ..tools.mcp_client import MCPClient, MCPClientConfig, MCPClientError
+from ..tools.mcp_batch import call_tools_with_fallback
+from ..tools.mcp_convenience import (
+    docs_unavailable, get_shared_client, close_shared_clients, get_shared_client_stats,
+    parse_prp_via_mcp
 )
-from ..models.research_models import ResearchRequest, ResearchResponse, SearchResult
-from ..models.project_models import PRPParsingResult
+from ..models.research_models import ResearchRequest, ResearchResponse
+from .prompts import RESEARCH_AGENT_PROMPT, RESEARCH_RUN_TEMPLATE
 
 logger = logging.getLogger(__name__)
 
+# Metrics reported in the parsePRP response text
+_METRICS_RE = re.compile(
+    r"(Total Tasks Extracted|Documentation Sections|Estimated Total Hours):[ \t]*(\d+)"
+)
+_METRIC_KEYS = {
+    "Total Tasks Extracted": "tasks_created",
+    "Documentation Sections": "documentation_created",
+    "Estimated Total Hours": "estimated_hours"
+}
+
+# Shared cap on in-flight outbound calls (search, LLM, MCP) across all agent
+# tools. One per event loop, since a semaphore can't be shared across loops;
+# created on first use because the limit comes from lazily loaded settings
+_OUTBOUND_SEMS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _outbound_semaphore() -> asyncio.Semaphore:
+    """Get the running loop's semaphore bounding concurrent outbound requests"""
+    loop = asyncio.get_running_loop()
+    sem = _OUTBOUND_SEMS.get(loop)
+    if sem is None:
+        sem = _OUTBOUND_SEMS[loop] = asyncio.Semaphore(get_settings().max_concurrent_requests)
+    return sem
 
-@dataclass
+
+async def _get_or_create_mcp_client(server_url: str, github_token: Optional[str]) -> MCPClient:
+    """
+    Get the shared MCP client for a server, so each agent tool reuses one
+    session and connection pool instead of reconnecting
+    
+    Args:
+        server_url: MCP server URL
+        github_token: GitHub token used to authenticate with the server
+        
+    Returns:
+        Ready-to-use MCP client
+    """
+    settings = get_settings()
+    return await get_shared_client(MCPClientConfig(
+        server_url=server_url,
+        github_token=github_token,
+        max_connections=settings.mcp_client_max_connections,
+        max_keepalive_connections=settings.mcp_client_max_keepalive_connections,
+        keepalive_expiry=settings.mcp_client_keepalive_expiry,
+        tools_cache_ttl=settings.mcp_tool_cache_ttl
+    ))
+
+
+async def close_mcp_clients() -> None:
+    """Close every cached MCP client and shared search/LLM client; call once on application shutdown"""
+    await close_shared_clients()
+    await close_web_search_tools()
+    await close_anthropic_clients()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Get MCP client cache hits, misses and current size (for debugging)"""
+    return get_shared_client_stats()
+
+
+@dataclass(frozen=True, slots=True)
 class ResearchAgentDependencies:
-    """Dependencies for the research agent"""
+    """Dependencies for the research agent (immutable; derive copies with dataclasses.replace)"""
     brave_api_key: str
     anthropic_api_key: str
     mcp_server_url: str
@@ -49,47 +115,9 @@ class ResearchOutput(BaseModel):
     error_message: Optional[str] = None
 
 
-# System prompt for the research agent
-RESEARCH_AGENT_PROMPT = """
-You are an expert research and project management agent with the ability to:
-
-1. **Conduct Web Research**: Search for current information on any technology, framework, or topic
-2. **Generate PRPs**: Create comprehensive Product Requirements Prompts based on research findings
-3. **Parse PRPs**: Use MCP server to extract structured tasks and documentation from PRPs
-4. **Create Projects**: Automatically set up complete project structures with tasks and documentation
-
-## Your Workflow:
-1. **Research Phase**: Use web search to gather comprehensive information about the topic
-2. **Analysis Phase**: Analyze research findings to identify key insights, best practices, and requirements
-3. **PRP Generation**: Create a detailed Product Requirements Prompt based on research
-4. **Project Creation**: Parse the PRP and create structured tasks and documentation via MCP server
-5. **Summary**: Provide complete project status and recommended next steps
-
-## Research Guidelines:
-- Use specific, targeted search queries to gather comprehensive information
-- Focus on latest best practices, common challenges, and recommended approaches
-- Identify key technologies, tools, and implementation patterns
-- Look for performance, security, and scalability considerations
-
-## PRP Guidelines:
-- Create detailed, actionable PRPs that can be parsed by AI systems
-- Include specific technical requirements and constraints
-- Provide realistic time estimates and priority levels
-- Structure requirements to enable automatic task extraction
-
-## Project Management:
-- Create logical task breakdown with clear dependencies
-- Generate appropriate documentation for different audiences
-- Use consistent naming and tagging for organization
-- Provide realistic estimates and milestone planning
-
-Always strive to provide comprehensive, actionable project setups that teams can immediately begin working on.
-"""
-
-
-# Initialize the research agent
+# Initialize the research agent. The model is passed per run instead of here,
+# so importing this module doesn't load settings or build model clients
 research_agent = Agent(
-    get_llm_model(),
     deps_type=ResearchAgentDependencies,
     result_type=ResearchOutput,
     system_prompt=RESEARCH_AGENT_PROMPT
@@ -113,17 +141,54 @@ async def search_web(
         Search results with analysis
     """
     try:
-        async with WebSearchTool(ctx.deps.brave_api_key) as search_tool:
+        search_tool = get_web_search_tool(ctx.deps.brave_api_key)
+        async with _outbound_semaphore():
             results = await search_tool.search_with_analysis(query, count)
-            
-        logger.info(f"Web search completed: {query} -> {results['total_results']} results")
+        
+        logger.info("Web search completed: %s -> %d results", query, results["total_results"])
         return results
         
     except WebSearchError as e:
-        logger.error(f"Web search failed: {e}")
+        logger.error("Web search failed: %s", e)
         return {"error": str(e), "results": []}
 
 
+@research_agent.tool
+async def search_web_batch(
+    ctx: RunContext[ResearchAgentDependencies],
+    queries: List[str],
+    count: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Search the web for several independent queries concurrently
+    
+    Args:
+        queries: Search queries to execute (e.g. one per focus area)
+        count: Number of results to return per query (1-20)
+        
+    Returns:
+        Search results with analysis, one entry per query in the same order
+    """
+    # Bound the fan-out per query (not around the gather) so a long query
+    # list doesn't trip Brave's rate limit or starve the other tools
+    semaphore = _outbound_semaphore()
+    
+    search_tool = get_web_search_tool(ctx.deps.brave_api_key)
+    
+    async def run_query(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await search_tool.search_with_analysis(query, count)
+            except WebSearchError as e:
+                logger.error("Web search failed: %s -> %s", query, e)
+                return {"query": query, "error": str(e), "results": []}
+    
+    results = await asyncio.gather(*(run_query(query) for query in queries))
+    
+    logger.info("Batch web search completed: %d queries", len(queries))
+    return results
+
+
 @research_agent.tool
 async def generate_prp_from_research(
     ctx: RunContext[ResearchAgentDependencies],
@@ -157,13 +222,15 @@ async def generate_prp_from_research(
             timeline=timeline
         )
         
-        prp_content = await writer.write_prp_from_research(research_input)
+        async with _outbound_semaphore():
+            prp_content = await writer.write_prp_from_research(research_input)
         
-        logger.info(f"PRP generated for topic: {topic} ({len(prp_content)} characters)")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("PRP generated for topic: %s (%d characters)", topic, len(prp_content))
         return prp_content
         
     except PRPWriterError as e:
-        logger.error(f"PRP generation failed: {e}")
+        logger.error("PRP generation failed: %s", e)
         return f"Error generating PRP: {e}"
 
 
@@ -184,51 +251,54 @@ async def parse_prp_and_create_project(
         Project creation results
     """
     try:
-        # Configure MCP client
-        mcp_config = MCPClientConfig(
-            server_url=ctx.deps.mcp_server_url,
-            github_token=ctx.deps.github_token
+        # Reuse the already-initialized client for this server
+        mcp_client = await _get_or_create_mcp_client(
+            ctx.deps.mcp_server_url,
+            ctx.deps.github_token
         )
         
-        async with MCPClient(mcp_config) as mcp_client:
-            # Parse PRP using MCP server
-            logger.info(f"Parsing PRP for project: {project_name}")
+        # Parse PRP using MCP server
+        logger.info("Parsing PRP for project: %s", project_name)
+        async with _outbound_semaphore():
             parse_result = await parse_prp_via_mcp(
                 mcp_client,
                 prp_content,
                 project_name=project_name
             )
+        
+        # Extract project data from parse result
+        # Note: This depends on the actual response format from your MCP server
+        if "content" in parse_result and parse_result["content"]:
+            content_text = parse_result["content"][0].get("text", "")
+            
+            # Parse the response text to extract key information
+            project_data = _extract_project_data_from_mcp_response(content_text)
+            
+            logger.info(
+                "Project created: %s - %d tasks, %d docs",
+                project_name, project_data["tasks_created"], project_data["documentation_created"]
+            )
+            
+            return {
+                "success": True,
+                "project_name": project_name,
+                "parse_result": parse_result,
+                **project_data
+            }
+        else:
+            return {
+                "success": False,
+                "error": "Failed to parse PRP - no content returned from MCP server"
+            }
             
-            # Extract project data from parse result
-            # Note: This depends on the actual response format from your MCP server
-            if "content" in parse_result and parse_result["content"]:
-                content_text = parse_result["content"][0].get("text", "")
-                
-                # Parse the response text to extract key information
-                project_data = _extract_project_data_from_mcp_response(content_text)
-                
-                logger.info(f"Project created: {project_name} - {project_data['tasks_created']} tasks, {project_data['documentation_created']} docs")
-                
-                return {
-                    "success": True,
-                    "project_name": project_name,
-                    "parse_result": parse_result,
-                    **project_data
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "Failed to parse PRP - no content returned from MCP server"
-                }
-                
     except MCPClientError as e:
-        logger.error(f"MCP client error: {e}")
+        logger.error("MCP client error: %s", e)
         return {
             "success": False,
             "error": f"MCP client error: {e}"
         }
     except Exception as e:
-        logger.error(f"Unexpected error in project creation: {e}")
+        logger.error("Unexpected error in project creation: %s", e)
         return {
             "success": False,
             "error": f"Unexpected error: {e}"
@@ -250,30 +320,39 @@ async def get_project_status(
         Project status information
     """
     try:
-        mcp_config = MCPClientConfig(
-            server_url=ctx.deps.mcp_server_url,
-            github_token=ctx.deps.github_token
+        mcp_client = await _get_or_create_mcp_client(
+            ctx.deps.mcp_server_url,
+            ctx.deps.github_token
         )
         
-        async with MCPClient(mcp_config) as mcp_client:
-            # Get tasks for the project
-            tasks_result = await mcp_client.call_tool("listTasks", {"projectName": project_name})
-            
-            # Try to get documentation
-            try:
-                docs_result = await mcp_client.call_tool("listDocumentation", {"projectName": project_name})
-            except:
-                docs_result = {"content": [{"text": "Documentation listing not available"}]}
-            
-            return {
-                "project_name": project_name,
-                "tasks": tasks_result,
-                "documentation": docs_result,
-                "status": "active"
-            }
-            
+        # Fetch tasks and documentation in one round trip; listDocumentation is
+        # only skipped when an already-discovered catalog shows it is missing
+        calls = [("listTasks", {"projectName": project_name})]
+        known_tools = mcp_client.available_tools
+        if known_tools is None or "listDocumentation" in known_tools:
+            calls.append(("listDocumentation", {"projectName": project_name}))
+        
+        async with _outbound_semaphore():
+            results = await call_tools_with_fallback(mcp_client, calls)
+        
+        tasks_result = results[0]
+        if isinstance(tasks_result, MCPClientError):
+            raise tasks_result
+        
+        if len(results) > 1 and not isinstance(results[1], MCPClientError):
+            docs_result = results[1]
+        else:
+            docs_result = docs_unavailable()
+        
+        return {
+            "project_name": project_name,
+            "tasks": tasks_result,
+            "documentation": docs_result,
+            "status": "active"
+        }
+        
     except MCPClientError as e:
-        logger.error(f"Failed to get project status: {e}")
+        logger.error("Failed to get project status: %s", e)
         return {
             "project_name": project_name,
             "error": str(e),
@@ -291,37 +370,17 @@ def _extract_project_data_from_mcp_response(response_text: str) -> Dict[str, Any
     Returns:
         Extracted project data
     """
-    # Parse the MCP response to extract key metrics
-    # This is a simple text parsing approach - in production you might want
-    # to use more sophisticated parsing or structured responses
-    
-    tasks_created = 0
-    documentation_created = 0
-    estimated_hours = 0
-    
-    lines = response_text.split('\n')
-    for line in lines:
-        if "Total Tasks Extracted:" in line:
-            try:
-                tasks_created = int(line.split(':')[-1].strip())
-            except:
-                pass
-        elif "Documentation Sections:" in line:
-            try:
-                documentation_created = int(line.split(':')[-1].strip())
-            except:
-                pass
-        elif "Estimated Total Hours:" in line:
-            try:
-                estimated_hours = int(line.split(':')[-1].strip())
-            except:
-                pass
-    
-    return {
-        "tasks_created": tasks_created,
-        "documentation_created": documentation_created,
-        "estimated_hours": estimated_hours
+    # One C-level scan over the response instead of splitting and checking
+    # every line; later occurrences win, as with the old line-by-line parse
+    project_data = {
+        "tasks_created": 0,
+        "documentation_created": 0,
+        "estimated_hours": 0
     }
+    for label, value in _METRICS_RE.findall(response_text):
+        project_data[_METRIC_KEYS[label]] = int(value)
+    
+    return project_data
 
 
 # Main research workflow function
@@ -339,33 +398,21 @@ async def conduct_research_and_create_project(
     Returns:
         Complete research and project creation response
     """
-    session_id = str(uuid.uuid4())
+    session_id = secrets.token_hex(16)
     
     try:
         # Run the research agent with the request
         result = await research_agent.run(
-            f"""
-            Conduct comprehensive research on "{request.topic}" and create a complete project structure.
-            
-            Requirements:
-            - Search depth: {request.search_depth} results
-            - Project goals: {request.project_goals or 'Not specified'}
-            - Target users: {request.target_users or 'Not specified'}
-            - Timeline: {request.timeline or 'Not specified'}
-            - Focus areas: {request.focus_areas or 'General research'}
-            
-            Please follow the complete workflow:
-            1. Research the topic thoroughly using web search
-            2. Generate a comprehensive PRP based on findings
-            3. Parse the PRP using MCP server to create project structure
-            4. Provide status and next steps
-            
-            Return structured output with all metrics and recommendations.
-            """,
-            deps=ResearchAgentDependencies(
-                **dependencies.__dict__,
-                session_id=session_id
-            )
+            RESEARCH_RUN_TEMPLATE.format(
+                topic=request.topic,
+                search_depth=request.search_depth,
+                project_goals=request.project_goals or 'Not specified',
+                target_users=request.target_users or 'Not specified',
+                timeline=request.timeline or 'Not specified',
+                focus_areas=request.focus_areas or 'General research'
+            ),
+            deps=replace(dependencies, session_id=session_id),
+            model=get_llm_model()
         )
         
         # Convert agent result to response format
@@ -385,7 +432,7 @@ async def conduct_research_and_create_project(
         )
         
     except Exception as e:
-        logger.error(f"Research workflow failed: {e}")
+        logger.error("Research workflow failed: %s", e)
         return ResearchResponse(
             success=False,
             session_id=session_id,
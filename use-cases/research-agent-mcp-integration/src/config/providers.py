@@ -2,11 +2,12 @@
 LLM provider configuration for Pydantic AI agents
 """
 
+from functools import lru_cache
 from typing import Union
 from pydantic_ai.models import Model, KnownModelName
 from pydantic_ai.models.anthropic import AnthropicModel
 from pydantic_ai.models.openai import OpenAIModel
-from .settings import settings
+from .settings import get_settings
 
 
 def get_llm_model(
@@ -21,11 +22,22 @@ def get_llm_model(
         model_name: Specific model name - defaults to settings
         
     Returns:
-        Configured Pydantic AI model instance
+        Configured Pydantic AI model instance (shared per provider/model)
     """
+    # Resolve defaults before the cache lookup so get_llm_model() and
+    # get_llm_model("anthropic", <default model>) share one instance
+    settings = get_settings()
     provider = provider or settings.default_model_provider
     model_name = model_name or settings.default_model
     
+    return _build_model_cached(provider, model_name)
+
+
+@lru_cache(maxsize=8)
+def _build_model_cached(provider: str, model_name: str) -> Model:
+    """Build a model (and its HTTP client) once per (provider, model_name)"""
+    settings = get_settings()
+    
     if provider == "anthropic":
         if not settings.anthropic_api_key:
             raise ValueError("Anthropic API key not configured")
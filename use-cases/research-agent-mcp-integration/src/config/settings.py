@@ -3,6 +3,7 @@ Configuration settings for the Research Agent MCP Integration
 """
 
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -24,6 +25,22 @@ class Settings(BaseSettings):
         default=None, 
         description="GitHub personal access token for MCP authentication"
     )
+    mcp_client_max_connections: int = Field(
+        default=200,
+        description="Maximum open connections to the MCP server"
+    )
+    mcp_client_max_keepalive_connections: int = Field(
+        default=100,
+        description="Maximum idle keep-alive connections kept to the MCP server"
+    )
+    mcp_client_keepalive_expiry: float = Field(
+        default=30.0,
+        description="Seconds an idle MCP connection is kept open"
+    )
+    mcp_tool_cache_ttl: float = Field(
+        default=60.0,
+        description="Seconds a discovered MCP tool list is reused before re-fetching"
+    )
     
     # Optional: Additional LLM providers
     openai_api_key: Optional[str] = Field(
@@ -59,5 +76,12 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Get the application settings, loading and validating them on first use
+    
+    Returns:
+        Process-wide Settings instance
+    """
+    return Settings()
\ No newline at end of file
@@ -1,12 +1,20 @@
 """
 Pydantic models for project management data structures
+
+Models that only ever hold data we build ourselves are slotted dataclasses;
+models fed by user or agent input stay pydantic so they are validated.
 """
 
+import hashlib
+from dataclasses import asdict, dataclass, field
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic.alias_generators import to_camel
 from datetime import datetime
 from enum import Enum
 
+from .serialization import FastDumpMixin
+
 
 class TaskStatus(str, Enum):
     """Task status enumeration"""
@@ -44,8 +52,12 @@ class DocumentationImportance(str, Enum):
     CRITICAL = "critical"
 
 
-class Task(BaseModel):
+class Task(FastDumpMixin, BaseModel):
     """Task data model"""
+    # Built in bulk from parsed PRPs: reject stray keys once at construction
+    # and never re-validate on attribute assignment
+    model_config = ConfigDict(extra='forbid', validate_assignment=False)
+    
     id: Optional[int] = Field(None, description="Task ID (set by database)")
     title: str = Field(..., description="Task title")
     description: str = Field(..., description="Task description")
@@ -58,14 +70,18 @@ class Task(BaseModel):
     created_by: str = Field(..., description="GitHub username who created the task")
     due_date: Optional[datetime] = Field(None, description="Task due date")
     completed_at: Optional[datetime] = Field(None, description="Task completion timestamp")
-    created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
-    updated_at: datetime = Field(default_factory=datetime.now, description="Last update timestamp")
+    created_at: Optional[datetime] = Field(None, description="Creation timestamp (set by database)")
+    updated_at: Optional[datetime] = Field(None, description="Last update timestamp (set by database)")
     tags: List[str] = Field(default_factory=list, description="Task tags")
     dependencies: List[int] = Field(default_factory=list, description="Task IDs this task depends on")
 
 
-class Documentation(BaseModel):
+class Documentation(FastDumpMixin, BaseModel):
     """Documentation data model"""
+    # Built in bulk from parsed PRPs: reject stray keys once at construction
+    # and never re-validate on attribute assignment
+    model_config = ConfigDict(extra='forbid', validate_assignment=False)
+    
     id: Optional[int] = Field(None, description="Documentation ID (set by database)")
     title: str = Field(..., description="Documentation title")
     content: str = Field(..., description="Documentation content (Markdown)")
@@ -77,9 +93,19 @@ class Documentation(BaseModel):
     )
     created_by: str = Field(..., description="GitHub username who created the documentation")
     version: str = Field(default="1.0", description="Documentation version")
-    created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
-    updated_at: datetime = Field(default_factory=datetime.now, description="Last update timestamp")
+    created_at: Optional[datetime] = Field(None, description="Creation timestamp (set by database)")
+    updated_at: Optional[datetime] = Field(None, description="Last update timestamp (set by database)")
     tags: List[str] = Field(default_factory=list, description="Documentation tags")
+    content_sha256: Optional[str] = Field(
+        None,
+        description="SHA-256 of the content, so unchanged docs can be skipped or deduplicated"
+    )
+    
+    @model_validator(mode='after')
+    def _hash_content(self) -> "Documentation":
+        if self.content_sha256 is None:
+            self.content_sha256 = hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+        return self
 
 
 class Tag(BaseModel):
@@ -92,35 +118,46 @@ class Tag(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
 
 
-class ProjectSummary(BaseModel):
-    """Summary of a project's current state"""
-    project_name: str = Field(..., description="Project name")
-    total_tasks: int = Field(..., description="Total number of tasks")
-    completed_tasks: int = Field(..., description="Number of completed tasks")
-    in_progress_tasks: int = Field(..., description="Number of in-progress tasks")
-    blocked_tasks: int = Field(..., description="Number of blocked tasks")
-    total_estimated_hours: int = Field(default=0, description="Total estimated hours")
-    total_actual_hours: int = Field(default=0, description="Total actual hours spent")
-    completion_percentage: float = Field(default=0.0, description="Project completion percentage")
-    documentation_count: int = Field(default=0, description="Number of documentation entries")
-    unique_assignees: int = Field(default=0, description="Number of unique assignees")
-    created_at: Optional[datetime] = Field(None, description="Project creation date")
-    last_activity: Optional[datetime] = Field(None, description="Last activity timestamp")
-
-
-class ProjectMetrics(BaseModel):
-    """Detailed project metrics"""
-    summary: ProjectSummary = Field(..., description="Project summary")
-    task_distribution: Dict[str, int] = Field(default_factory=dict, description="Tasks by status")
-    priority_distribution: Dict[str, int] = Field(default_factory=dict, description="Tasks by priority")
-    assignee_workload: Dict[str, int] = Field(default_factory=dict, description="Tasks per assignee")
-    documentation_types: Dict[str, int] = Field(default_factory=dict, description="Documentation by type")
-    recent_activity: List[Dict[str, Any]] = Field(default_factory=list, description="Recent project activity")
-    velocity_metrics: Dict[str, float] = Field(default_factory=dict, description="Project velocity metrics")
-
-
-class CreateTaskRequest(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ProjectSummary:
+    """Summary of a project's current state (built internally, so not validated)"""
+    project_name: str  # Project name
+    total_tasks: int  # Total number of tasks
+    completed_tasks: int  # Number of completed tasks
+    in_progress_tasks: int  # Number of in-progress tasks
+    blocked_tasks: int  # Number of blocked tasks
+    total_estimated_hours: int = 0  # Total estimated hours
+    total_actual_hours: int = 0  # Total actual hours spent
+    completion_percentage: float = 0.0  # Project completion percentage
+    documentation_count: int = 0  # Number of documentation entries
+    unique_assignees: int = 0  # Number of unique assignees
+    created_at: Optional[datetime] = None  # Project creation date
+    last_activity: Optional[datetime] = None  # Last activity timestamp
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True, kw_only=True)
+class ProjectMetrics:
+    """Detailed project metrics (built internally, so not validated)"""
+    summary: ProjectSummary  # Project summary
+    task_distribution: Dict[str, int] = field(default_factory=dict)  # Tasks by status
+    priority_distribution: Dict[str, int] = field(default_factory=dict)  # Tasks by priority
+    assignee_workload: Dict[str, int] = field(default_factory=dict)  # Tasks per assignee
+    documentation_types: Dict[str, int] = field(default_factory=dict)  # Documentation by type
+    recent_activity: List[Dict[str, Any]] = field(default_factory=list)  # Recent project activity
+    velocity_metrics: Dict[str, float] = field(default_factory=dict)  # Project velocity metrics
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class CreateTaskRequest(FastDumpMixin, BaseModel):
     """Request to create a new task"""
+    # Serialized with the server's camelCase argument names
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+    
     title: str = Field(..., description="Task title")
     description: str = Field(..., description="Task description")
     project_name: str = Field(..., description="Project name")
@@ -131,8 +168,10 @@ class CreateTaskRequest(BaseModel):
     tags: List[str] = Field(default_factory=list, description="Task tags")
 
 
-class CreateDocumentationRequest(BaseModel):
+class CreateDocumentationRequest(FastDumpMixin, BaseModel):
     """Request to create new documentation"""
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+    
     title: str = Field(..., description="Documentation title")
     content: str = Field(..., description="Documentation content")
     type: DocumentationType = Field(..., description="Documentation type")
@@ -144,14 +183,18 @@ class CreateDocumentationRequest(BaseModel):
     tags: List[str] = Field(default_factory=list, description="Documentation tags")
 
 
-class PRPParsingResult(BaseModel):
-    """Result from PRP parsing via MCP server"""
-    success: bool = Field(..., description="Whether parsing was successful")
-    project_name: str = Field(..., description="Extracted project name")
-    tasks_extracted: int = Field(..., description="Number of tasks extracted")
-    documentation_extracted: int = Field(..., description="Number of documentation sections extracted")
-    total_estimated_hours: int = Field(default=0, description="Total estimated hours")
-    complexity_level: str = Field(..., description="Project complexity level")
-    suggested_tags: List[str] = Field(default_factory=list, description="Suggested project tags")
-    parsing_history_id: Optional[int] = Field(None, description="MCP parsing history ID")
-    error_message: Optional[str] = Field(None, description="Error message if parsing failed")
\ No newline at end of file
+@dataclass(slots=True, kw_only=True)
+class PRPParsingResult:
+    """Result from PRP parsing via MCP server (built internally, so not validated)"""
+    success: bool  # Whether parsing was successful
+    project_name: str  # Extracted project name
+    tasks_extracted: int  # Number of tasks extracted
+    documentation_extracted: int  # Number of documentation sections extracted
+    total_estimated_hours: int = 0  # Total estimated hours
+    complexity_level: str  # Project complexity level
+    suggested_tags: List[str] = field(default_factory=list)  # Suggested project tags
+    parsing_history_id: Optional[int] = None  # MCP parsing history ID
+    error_message: Optional[str] = None  # Error message if parsing failed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
@@ -1,20 +1,39 @@
 """
 Pydantic models for research-related data structures
+
+Models that only ever hold data we build ourselves are slotted dataclasses;
+models fed by user or agent input stay pydantic so they are validated.
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, HttpUrl
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
+from .serialization import FastDumpMixin
 
-class SearchResult(BaseModel):
+
+class SearchResult(FastDumpMixin, BaseModel):
     """Individual web search result"""
+    # Built once per search hit: reject stray keys once at construction
+    # and never re-validate on attribute assignment
+    model_config = ConfigDict(extra='forbid', validate_assignment=False)
+    
     title: str = Field(..., description="Title of the search result")
-    url: HttpUrl = Field(..., description="URL of the search result")
+    # Plain str: URLs come straight from the search API, so per-row HttpUrl
+    # parsing would only re-check what the API already guarantees
+    url: str = Field(..., description="URL of the search result")
     description: str = Field(..., description="Description/snippet from the search result")
     age: Optional[str] = Field(None, description="Age of the content (e.g., '2 days ago')")
     score: Optional[float] = Field(None, description="Relevance score (0.0 to 1.0)")
     domain: Optional[str] = Field(None, description="Domain of the source")
+    
+    def model_post_init(self, __context: Any) -> None:
+        # Derive the domain once at ingest instead of re-parsing the URL downstream
+        if self.domain is None:
+            self.domain = urlsplit(self.url).netloc or None
 
 
 class SearchQuery(BaseModel):
@@ -29,14 +48,18 @@ class SearchQuery(BaseModel):
     safe_search: str = Field(default="moderate", description="Safe search setting")
 
 
-class SearchAnalysis(BaseModel):
-    """Analysis of search results"""
-    total_results: int = Field(..., description="Total number of search results")
-    unique_domains: int = Field(..., description="Number of unique domains in results")
-    average_score: Optional[float] = Field(None, description="Average relevance score")
-    top_domains: List[tuple] = Field(default_factory=list, description="Most frequent domains")
-    has_recent_results: bool = Field(default=False, description="Whether results include recent content")
-    summary: str = Field(..., description="Summary of the search analysis")
+@dataclass(slots=True, kw_only=True)
+class SearchAnalysis:
+    """Analysis of search results (built internally, so not validated)"""
+    total_results: int  # Total number of search results
+    unique_domains: int  # Number of unique domains in results
+    average_score: Optional[float] = None  # Average relevance score
+    top_domains: List[Tuple[str, int]] = field(default_factory=list)  # Most frequent (domain, count) pairs
+    has_recent_results: bool = False  # Whether results include recent content
+    summary: str  # Summary of the search analysis
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 
 class ResearchContext(BaseModel):
@@ -70,8 +93,8 @@ class ResearchSession(BaseModel):
     results: List[SearchResult] = Field(default_factory=list, description="All search results")
     insights: Optional[ResearchInsights] = Field(None, description="Extracted insights")
     prp_content: Optional[str] = Field(None, description="Generated PRP content")
-    created_at: datetime = Field(default_factory=datetime.now, description="Session creation time")
-    updated_at: datetime = Field(default_factory=datetime.now, description="Last update time")
+    created_at: Optional[datetime] = Field(None, description="Session creation time")
+    updated_at: Optional[datetime] = Field(None, description="Last update time")
     status: str = Field(default="active", description="Session status (active, completed, failed)")
 
 
@@ -86,17 +109,21 @@ class ResearchRequest(BaseModel):
     focus_areas: Optional[List[str]] = Field(None, description="Specific areas to focus research on")
 
 
-class ResearchResponse(BaseModel):
-    """Response from research and project creation"""
-    success: bool = Field(..., description="Whether the operation was successful")
-    session_id: str = Field(..., description="Research session ID")
-    topic: str = Field(..., description="Research topic")
-    search_results_count: int = Field(..., description="Number of search results found")
-    prp_generated: bool = Field(..., description="Whether PRP was generated")
-    prp_parsed: bool = Field(..., description="Whether PRP was parsed by MCP server")
-    tasks_created: int = Field(default=0, description="Number of tasks created")
-    documentation_created: int = Field(default=0, description="Number of documentation entries created")
-    project_name: Optional[str] = Field(None, description="Generated project name")
-    estimated_hours: Optional[int] = Field(None, description="Total estimated project hours")
-    next_steps: List[str] = Field(default_factory=list, description="Recommended next steps")
-    error_message: Optional[str] = Field(None, description="Error message if operation failed")
\ No newline at end of file
+@dataclass(slots=True, kw_only=True)
+class ResearchResponse:
+    """Response from research and project creation (built internally, so not validated)"""
+    success: bool  # Whether the operation was successful
+    session_id: str  # Research session ID
+    topic: str  # Research topic
+    search_results_count: int  # Number of search results found
+    prp_generated: bool  # Whether PRP was generated
+    prp_parsed: bool  # Whether PRP was parsed by MCP server
+    tasks_created: int = 0  # Number of tasks created
+    documentation_created: int = 0  # Number of documentation entries created
+    project_name: Optional[str] = None  # Generated project name
+    estimated_hours: Optional[int] = None  # Total estimated project hours
+    next_steps: List[str] = field(default_factory=list)  # Recommended next steps
+    error_message: Optional[str] = None  # Error message if operation failed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
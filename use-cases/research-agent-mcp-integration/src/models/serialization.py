@@ -0,0 +1,21 @@
+"""
+Shared serialization helpers for the pydantic models
+"""
+
+
+class FastDumpMixin:
+    """Adds a direct-to-bytes JSON dump to pydantic models"""
+    
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize the model straight to UTF-8 JSON bytes
+        
+        pydantic-core writes the bytes itself (datetimes and enums included),
+        skipping the intermediate dict of model_dump() and the str of
+        model_dump_json(). Fields use their aliases and unset optionals are
+        dropped, which is the form MCP tool arguments take.
+        
+        Returns:
+            JSON-encoded model
+        """
+        return self.__pydantic_serializer__.to_json(self, by_alias=True, exclude_none=True)
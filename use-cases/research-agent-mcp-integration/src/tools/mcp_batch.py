@@ -0,0 +1,126 @@
+"""
+Batching helpers for the MCP client
+
+Send several tool calls in one JSON-RPC batch request, either explicitly
+with a fallback to single calls, or by queueing calls made in the same tick.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Tuple, Union
+
+from .mcp_client import MCPClient, MCPClientError, MCPAuthenticationError
+
+logger = logging.getLogger(__name__)
+
+
+async def call_tools_with_fallback(
+    client: MCPClient,
+    requests: List[Tuple[str, Dict[str, Any]]]
+) -> List[Union[Dict[str, Any], MCPClientError]]:
+    """
+    Call several tools in one batch, degrading to one call_tool per request
+    
+    A single request is sent as a plain tools/call. If the server rejects the
+    batch itself (e.g. it doesn't support JSON-RPC batch arrays), the requests
+    are sent one by one instead. Authentication failures are always raised.
+    
+    Args:
+        client: MCP client instance
+        requests: (tool_name, arguments) pairs to call
+        
+    Returns:
+        Tool results in request order, with failed calls as MCPClientError entries
+    """
+    if len(requests) > 1:
+        try:
+            return await client.call_tools_batch(requests, return_exceptions=True)
+        except MCPAuthenticationError:
+            raise
+        except MCPClientError as e:
+            logger.info("Batch call rejected (%s); calling tools one by one", e)
+    
+    results: List[Union[Dict[str, Any], MCPClientError]] = []
+    for tool_name, arguments in requests:
+        try:
+            results.append(await client.call_tool(tool_name, arguments))
+        except MCPAuthenticationError:
+            raise
+        except MCPClientError as e:
+            results.append(e)
+    return results
+
+
+class MCPCallQueue:
+    """
+    Collects tool calls issued in the same event-loop tick into one batch request.
+    
+    Each add() returns a future; the queue flushes on the next loop iteration
+    through MCPClient.call_tools_batch, so N calls cost one round trip:
+    
+        queue = MCPCallQueue(client)
+        results = await asyncio.gather(
+            queue.add("createTask", task_args),
+            queue.add("createDocumentation", doc_args)
+        )
+    """
+    
+    def __init__(self, client: MCPClient):
+        self.client = client
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._flush_tasks: set = set()
+    
+    def add(self, tool_name: str, arguments: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a tool call for the next batch
+        
+        Args:
+            tool_name: Name of the tool to call
+            arguments: Tool arguments as a dictionary
+            
+        Returns:
+            Future resolving to the tool result (or raising its MCPClientError)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((tool_name, arguments, future))
+        
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._start_flush)
+        
+        return future
+    
+    def _start_flush(self) -> None:
+        """Start a flush task for everything queued during this tick"""
+        self._flush_scheduled = False
+        task = asyncio.ensure_future(self.flush())
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def flush(self) -> None:
+        """Send every queued call now as a single batch request"""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        
+        try:
+            results = await self.client.call_tools_batch(
+                [(name, arguments) for name, arguments, _ in pending],
+                return_exceptions=True
+            )
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,237 @@
+"""
+Tool catalog cache for the MCP client
+
+Discovered tool lists and their compiled inputSchema checks are shared by
+every MCPClient for a server, so discovery and argument validation cost one
+tools/list per TTL rather than one per client.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from .mcp_transport import (
+    MCPClientError, MCPAuthenticationError, MCPServerError, _TOOLS_LIST_BODY, _json_loads
+)
+
+try:
+    from jsonschema import Draft7Validator
+    from jsonschema.exceptions import best_match
+except ImportError:  # optional; without it only required arguments are checked
+    Draft7Validator = None
+
+logger = logging.getLogger(__name__)
+
+# Tool catalogs only change when the server is redeployed, so discovery
+# results are shared across clients for config.tools_cache_ttl seconds:
+# server_url -> (fetched_at, {tool name: description and inputSchema})
+_TOOLS_CACHE: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+# Compiled inputSchema checks, built on first use: server_url -> {tool name: check}
+_SCHEMA_VALIDATORS: Dict[str, Dict[str, Callable[[Dict[str, Any]], Optional[str]]]] = {}
+# One lock per server (and event loop, since a lock can't be shared across
+# loops) so concurrent cache misses trigger a single tools/list
+_TOOLS_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+_TOOLS_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def invalidate_tools(server_url: Optional[str] = None) -> None:
+    """
+    Drop cached tool lists so the next discovery hits the server again
+    
+    Args:
+        server_url: Server whose entry to drop; clears every server if omitted
+    """
+    if server_url is None:
+        _TOOLS_CACHE.clear()
+        _SCHEMA_VALIDATORS.clear()
+    else:
+        _TOOLS_CACHE.pop(server_url, None)
+        _SCHEMA_VALIDATORS.pop(server_url, None)
+
+
+def get_tools_cache_stats() -> Dict[str, int]:
+    """Get tool discovery cache hits, misses and number of cached servers (for debugging)"""
+    return {**_TOOLS_CACHE_STATS, "size": len(_TOOLS_CACHE)}
+
+
+def _compile_schema(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Compile a tool's inputSchema into a check that returns an error message or None
+    
+    Args:
+        schema: JSON Schema from the tool's tools/list entry
+        
+    Returns:
+        Reusable argument check
+    """
+    if Draft7Validator is not None:
+        validator = Draft7Validator(schema)
+        
+        def check(arguments: Dict[str, Any]) -> Optional[str]:
+            error = best_match(validator.iter_errors(arguments))
+            return error.message if error is not None else None
+        
+        return check
+    
+    required = tuple(schema.get("required", ()))
+    
+    def check(arguments: Dict[str, Any]) -> Optional[str]:
+        missing = [key for key in required if key not in arguments]
+        return f"missing required arguments: {', '.join(missing)}" if missing else None
+    
+    return check
+
+
+def _check_arguments(
+    server_url: str,
+    tool_name: str,
+    description: Dict[str, Any],
+    arguments: Dict[str, Any]
+) -> None:
+    """Validate arguments against a tool's cached inputSchema, compiling it once per server"""
+    schema = description.get("inputSchema")
+    if not schema:
+        return
+    
+    checks = _SCHEMA_VALIDATORS.setdefault(server_url, {})
+    check = checks.get(tool_name)
+    if check is None:
+        check = checks[tool_name] = _compile_schema(schema)
+    
+    error = check(arguments)
+    if error is not None:
+        raise MCPClientError(f"Invalid arguments for {tool_name}: {error}")
+
+
+class _ToolCatalog:
+    """
+    Tool discovery and catalog lookups for MCPClient.
+    
+    Expects config and the _MCPTransport request methods from MCPClient, and
+    keeps the last discovered catalog in _server_descriptions.
+    """
+    
+    def _cached_tools(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get the server's tool descriptions from the shared cache if they are still fresh"""
+        if not self.config.use_tools_cache:
+            return None
+        
+        cached = _TOOLS_CACHE.get(self.config.server_url)
+        if cached and time.monotonic() - cached[0] < self.config.tools_cache_ttl:
+            _TOOLS_CACHE_STATS["hits"] += 1
+            return cached[1]
+        return None
+    
+    async def discover_tools(self, force_refresh: bool = False) -> List[str]:
+        """
+        Discover available tools from the MCP server
+        
+        Args:
+            force_refresh: Skip the cache and re-fetch, e.g. after a server deploy
+        
+        Returns:
+            List of tool names available on the server
+        """
+        if not force_refresh:
+            cached = self._cached_tools()
+            if cached is not None:
+                return self._set_descriptions(cached)
+        
+        locks = _TOOLS_LOCKS.setdefault(asyncio.get_running_loop(), {})
+        lock = locks.setdefault(self.config.server_url, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed the entry while we waited
+            if not force_refresh:
+                cached = self._cached_tools()
+                if cached is not None:
+                    return self._set_descriptions(cached)
+            
+            _TOOLS_CACHE_STATS["misses"] += 1
+            deadline = min(self.config.discovery_timeout, self.config.timeout)
+            try:
+                return await asyncio.wait_for(self._fetch_tools(), timeout=deadline)
+            except asyncio.TimeoutError:
+                self._record_failure()
+                raise MCPClientError(f"Tool discovery timed out after {deadline}s")
+    
+    def _set_descriptions(self, descriptions: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Adopt a server's tool descriptions and return the tool names"""
+        self._server_descriptions = descriptions
+        self._available_tools = list(descriptions)
+        return self._available_tools
+    
+    @property
+    def available_tools(self) -> Optional[List[str]]:
+        """Tool names from this client's last discovery, or None before the first one"""
+        return self._available_tools
+    
+    def has_tool(self, tool_name: str) -> bool:
+        """Check whether a tool was in the last discovered catalog (a dict lookup, no network)"""
+        return tool_name in self._server_descriptions
+    
+    def get_tool_schema(self, tool_name: str) -> Dict[str, Any]:
+        """
+        Get a discovered tool's description without a network call
+        
+        Args:
+            tool_name: Name of the tool
+            
+        Returns:
+            The tool's tools/list entry (name, description, inputSchema, ...)
+        """
+        try:
+            return self._server_descriptions[tool_name]
+        except KeyError:
+            raise MCPClientError(f"Tool '{tool_name}' has not been discovered") from None
+    
+    def validate_args(self, tool_name: str, arguments: Dict[str, Any]) -> None:
+        """
+        Check arguments against a discovered tool's inputSchema
+        
+        The schema is compiled once per server and tool, so repeated calls are
+        a lookup plus the check itself.
+        
+        Args:
+            tool_name: Name of the tool
+            arguments: Arguments to check
+        """
+        _check_arguments(
+            self.config.server_url, tool_name, self.get_tool_schema(tool_name), arguments
+        )
+    
+    async def _fetch_tools(self) -> List[str]:
+        """Fetch the tool list from the server and store it in the shared cache"""
+        import httpx
+        
+        try:
+            # MCP servers expose tools via the tools/list endpoint
+            response = await self._post("/tools/list", _TOOLS_LIST_BODY, idempotent=True)
+            response.raise_for_status()
+            
+            data = _json_loads(response.content)
+            if "error" in data:
+                raise MCPServerError(f"Tool discovery failed: {data['error']}")
+            
+            tools = data.get("result", {}).get("tools", [])
+            descriptions = {tool["name"]: tool for tool in tools}
+            _TOOLS_CACHE[self.config.server_url] = (time.monotonic(), descriptions)
+            # Schemas may have changed with the catalog; recompile on next use
+            _SCHEMA_VALIDATORS.pop(self.config.server_url, None)
+            self._set_descriptions(descriptions)
+            
+            logger.info("Discovered %d tools: %s", len(self._available_tools), self._available_tools)
+            return self._available_tools
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                raise MCPAuthenticationError("GitHub authentication required for MCP server")
+            raise MCPClientError(f"HTTP error during tool discovery: {e}")
+        except httpx.TransportError as e:
+            invalidate_tools(self.config.server_url)
+            raise MCPClientError(f"Connection error during tool discovery: {e}")
+        except Exception as e:
+            raise MCPClientError(f"Failed to discover tools: {e}")
@@ -3,42 +3,76 @@ MCP Client Tools for connecting to Deepify MCP Server
 
 These tools enable Pydantic AI agents to communicate with your existing
 Deepify MCP Server, calling tools like parsePRP, createTask, etc.
+
+Transport and the tool catalog cache live in mcp_transport and mcp_cache;
+shared clients, batching helpers and per-tool convenience functions in
+mcp_convenience and mcp_batch.
 """
 
-import httpx
-import json
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Union
-from dataclasses import dataclass
-
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class MCPClientConfig:
-    """Configuration for MCP client connection"""
-    server_url: str
-    github_token: Optional[str] = None
-    timeout: int = 30
-    max_retries: int = 3
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
 
+# Config, errors and cache helpers are re-exported so callers can keep
+# importing them from here
+from .mcp_transport import (
+    MCPClientConfig, MCPClientError, MCPAuthenticationError, MCPServerError, install_uvloop,
+    _MCPTransport, _PING_BODY, _RESOURCES_LIST_BODY,
+    _acquire_client, _release_client, _breaker_state, _transport_key, _call_payload, _json_dumps, _json_loads
+)
+from .mcp_cache import (
+    invalidate_tools, get_tools_cache_stats, _ToolCatalog, _TOOLS_CACHE, _check_arguments
+)
 
-class MCPClientError(Exception):
-    """Base exception for MCP client errors"""
-    pass
+try:
+    import ijson
+except ImportError:  # optional; call_tool_stream then parses the buffered body
+    ijson = None
 
+logger = logging.getLogger(__name__)
 
-class MCPAuthenticationError(MCPClientError):
-    """Authentication failed with MCP server"""
-    pass
+# Read-only tools that are safe to re-send after a dropped connection
+_IDEMPOTENT_TOOLS = frozenset({"listTasks", "listDocumentation"})
 
 
-class MCPServerError(MCPClientError):
-    """MCP server returned an error"""
-    pass
+class _ContentStream:
+    """Assemble result.content blocks (or a JSON-RPC error) from ijson parse events"""
+    
+    def __init__(self):
+        self.error: Optional[Dict[str, Any]] = None
+        self._builder = None
+        self._prefix: Optional[str] = None
+    
+    def feed(self, events: List[Tuple[str, str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Consume parse events and return the content blocks they completed
+        
+        Args:
+            events: (prefix, event, value) tuples from ijson
+            
+        Returns:
+            Content blocks finished by these events, in order
+        """
+        blocks = []
+        for prefix, event, value in events:
+            if self._builder is None:
+                if event != "start_map" or prefix not in ("result.content.item", "error"):
+                    continue
+                self._builder, self._prefix = ijson.ObjectBuilder(), prefix
+            
+            self._builder.event(event, value)
+            if event == "end_map" and prefix == self._prefix:
+                if prefix == "error":
+                    self.error = self._builder.value
+                else:
+                    blocks.append(self._builder.value)
+                self._builder = None
+        return blocks
 
 
-class MCPClient:
+class MCPClient(_ToolCatalog, _MCPTransport):
     """
     HTTP client for communicating with MCP servers via HTTP transport.
     
@@ -51,95 +85,117 @@ class MCPClient:
     
     def __init__(self, config: MCPClientConfig):
         self.config = config
-        self.client = httpx.AsyncClient(
-            timeout=config.timeout,
-            headers=self._get_headers()
-        )
+        # Pooled HTTP client shared with every MCPClient for the same server and
+        # transport settings; auth differs per client, so headers are sent per request
+        self._transport_key = _transport_key(config)
+        self.client = _acquire_client(config)
+        self._headers = self._get_headers()
+        self._released = False
         self._available_tools: Optional[List[str]] = None
+        self._server_descriptions: Dict[str, Dict[str, Any]] = {}
+        self._breaker = _breaker_state(config.server_url)
+        # cache key -> (expires_at, result)
+        self._tool_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
     
-    def _get_headers(self) -> Dict[str, str]:
-        """Get HTTP headers for MCP requests"""
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "Research-Agent-MCP-Client/1.0"
-        }
-        
-        if self.config.github_token:
-            headers["Authorization"] = f"Bearer {self.config.github_token}"
+    async def ping_health(self) -> bool:
+        """
+        Check that the server answers a JSON-RPC ping
         
-        return headers
+        Returns:
+            True if the server responded without an error
+        """
+        await self._rpc("/ping", _PING_BODY)
+        return True
     
-    async def discover_tools(self) -> List[str]:
+    async def list_resources(self) -> List[Dict[str, Any]]:
         """
-        Discover available tools from the MCP server
+        List the resources the server exposes
         
         Returns:
-            List of tool names available on the server
+            Resource descriptors as returned by resources/list
         """
-        try:
-            # MCP servers expose tools via the tools/list endpoint
-            response = await self.client.post(
-                f"{self.config.server_url}/tools/list",
-                json={"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}}
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            if "error" in data:
-                raise MCPServerError(f"Tool discovery failed: {data['error']}")
-            
-            tools = data.get("result", {}).get("tools", [])
-            self._available_tools = [tool["name"] for tool in tools]
-            
-            logger.info(f"Discovered {len(self._available_tools)} tools: {self._available_tools}")
-            return self._available_tools
-            
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                raise MCPAuthenticationError("GitHub authentication required for MCP server")
-            raise MCPClientError(f"HTTP error during tool discovery: {e}")
-        except Exception as e:
-            raise MCPClientError(f"Failed to discover tools: {e}")
+        result = await self._rpc("/resources/list", _RESOURCES_LIST_BODY)
+        return result.get("resources", [])
+    
+    def _tool_cache_key(self, tool_name: str, arguments: Union[Dict[str, Any], bytes]) -> str:
+        """Build the result cache key from the server, tool and a digest of the arguments"""
+        if not isinstance(arguments, bytes):
+            arguments = _json_dumps(arguments, sort_keys=True)
+        digest = hashlib.blake2b(arguments, digest_size=16).hexdigest()
+        return f"{self.config.server_url}:{tool_name}:{digest}"
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_call(self, tool_name: str, arguments: Union[Dict[str, Any], bytes]) -> None:
+        """Reject unknown tools and bad arguments locally when a fresh catalog is cached"""
+        cached = _TOOLS_CACHE.get(self.config.server_url)
+        if not (
+            cached
+            and self.config.use_tools_cache
+            and time.monotonic() - cached[0] < self.config.tools_cache_ttl
+        ):
+            return
+        
+        description = cached[1].get(tool_name)
+        if description is None:
+            raise MCPClientError(f"Tool '{tool_name}' not found on server")
+        if not isinstance(arguments, bytes):
+            _check_arguments(self.config.server_url, tool_name, description, arguments)
+    
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Union[Dict[str, Any], bytes],
+        cache: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """
         Call a tool on the MCP server
         
         Args:
             tool_name: Name of the tool to call
-            arguments: Tool arguments as a dictionary
+            arguments: Tool arguments as a dictionary, or already-serialized
+                JSON bytes (e.g. a request model's to_json_bytes())
+            cache: Whether to use the result cache (when config.use_tool_cache
+                is on); defaults to caching only read-only tools
             
         Returns:
-            Tool response data
+            Tool response data (cached results are shared, so don't mutate them)
         """
+        import httpx
+        
+        cache_key = None
+        if self.config.use_tool_cache and (tool_name in _IDEMPOTENT_TOOLS if cache is None else cache):
+            cache_key = self._tool_cache_key(tool_name, arguments)
+            hit = self._tool_cache.get(cache_key)
+            if hit is not None:
+                if time.monotonic() < hit[0]:
+                    self._tool_cache.move_to_end(cache_key)
+                    return hit[1]
+                del self._tool_cache[cache_key]
+        
+        self._check_call(tool_name, arguments)
+        
         try:
-            # Prepare MCP tool call request
-            request_data = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
+            payload = _call_payload(tool_name, arguments)
             
-            logger.info(f"Calling MCP tool: {tool_name} with args: {arguments}")
+            logger.info("Calling MCP tool: %s with args: %s", tool_name, arguments)
             
-            response = await self.client.post(
-                f"{self.config.server_url}/tools/call",
-                json=request_data
+            response = await self._post(
+                "/tools/call",
+                payload,
+                idempotent=tool_name in _IDEMPOTENT_TOOLS
             )
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             if "error" in data:
                 error_msg = data["error"].get("message", "Unknown MCP error")
                 raise MCPServerError(f"Tool '{tool_name}' failed: {error_msg}")
             
             result = data.get("result", {})
-            logger.info(f"Tool '{tool_name}' completed successfully")
+            logger.info("Tool '%s' completed successfully", tool_name)
+            
+            if cache_key is not None:
+                self._store_result(cache_key, result)
             
             return result
             
@@ -149,199 +205,215 @@ class MCPClient:
             elif e.response.status_code == 404:
                 raise MCPClientError(f"Tool '{tool_name}' not found on server")
             raise MCPClientError(f"HTTP error calling tool '{tool_name}': {e}")
+        except httpx.TransportError as e:
+            invalidate_tools(self.config.server_url)
+            raise MCPClientError(f"Connection error calling tool '{tool_name}': {e}")
+        except MCPClientError:
+            raise
         except Exception as e:
             raise MCPClientError(f"Failed to call tool '{tool_name}': {e}")
     
-    async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
-    
-    async def __aenter__(self):
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.close()
-
-
-# Convenience functions for specific MCP tools
-async def parse_prp_via_mcp(
-    client: MCPClient,
-    prp_content: str,
-    project_name: Optional[str] = None,
-    project_context: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Parse a PRP using the MCP server's parsePRP tool
-    
-    Args:
-        client: MCP client instance
-        prp_content: The PRP content to parse
-        project_name: Optional project name
-        project_context: Optional project context
+    def _store_result(self, cache_key: str, result: Dict[str, Any]) -> None:
+        """
+        Cache a tool result, honoring the server's client-only _meta.cache_hint
         
-    Returns:
-        Parsed PRP data with tasks, documentation, and metadata
-    """
-    arguments = {"prpContent": prp_content}
-    
-    if project_name:
-        arguments["projectName"] = project_name
-    
-    if project_context:
-        arguments["projectContext"] = project_context
-    
-    return await client.call_tool("parsePRP", arguments)
-
-
-async def create_task_via_mcp(
-    client: MCPClient,
-    title: str,
-    description: str,
-    project_name: str,
-    priority: str = "medium",
-    estimated_hours: Optional[int] = None,
-    assigned_to: Optional[str] = None,
-    tags: Optional[List[str]] = None
-) -> Dict[str, Any]:
-    """
-    Create a task using the MCP server's createTask tool
-    
-    Args:
-        client: MCP client instance
-        title: Task title
-        description: Task description
-        project_name: Project name
-        priority: Task priority (low, medium, high, critical)
-        estimated_hours: Estimated hours to complete
-        assigned_to: GitHub username to assign task to
-        tags: List of tags to associate with task
+        "no-cache" skips the store and {"ttl": seconds} overrides config.tool_cache_ttl.
         
-    Returns:
-        Created task data
-    """
-    arguments = {
-        "title": title,
-        "description": description,
-        "projectName": project_name,
-        "priority": priority
-    }
-    
-    if estimated_hours is not None:
-        arguments["estimatedHours"] = estimated_hours
-    
-    if assigned_to:
-        arguments["assignedTo"] = assigned_to
-    
-    if tags:
-        arguments["tags"] = tags
-    
-    return await client.call_tool("createTask", arguments)
-
-
-async def create_documentation_via_mcp(
-    client: MCPClient,
-    title: str,
-    content: str,
-    doc_type: str,
-    project_name: str,
-    importance: str = "medium",
-    tags: Optional[List[str]] = None
-) -> Dict[str, Any]:
-    """
-    Create documentation using the MCP server's createDocumentation tool
-    
-    Args:
-        client: MCP client instance
-        title: Documentation title
-        content: Documentation content
-        doc_type: Type of documentation (guide, reference, api, etc.)
-        project_name: Project name
-        importance: Documentation importance (low, medium, high, critical)
-        tags: List of tags to associate with documentation
+        Args:
+            cache_key: Key from _tool_cache_key
+            result: Tool result to cache
+        """
+        hint = result.get("_meta", {}).get("cache_hint")
+        if hint == "no-cache":
+            return
         
-    Returns:
-        Created documentation data
-    """
-    arguments = {
-        "title": title,
-        "content": content,
-        "type": doc_type,
-        "projectName": project_name,
-        "importance": importance
-    }
-    
-    if tags:
-        arguments["tags"] = tags
-    
-    return await client.call_tool("createDocumentation", arguments)
-
-
-async def list_tasks_via_mcp(
-    client: MCPClient,
-    project_name: Optional[str] = None,
-    status: Optional[str] = None,
-    assigned_to: Optional[str] = None,
-    limit: int = 50
-) -> Dict[str, Any]:
-    """
-    List tasks using the MCP server's listTasks tool
-    
-    Args:
-        client: MCP client instance
-        project_name: Filter by project name
-        status: Filter by task status
-        assigned_to: Filter by assignee
-        limit: Maximum number of tasks to return
+        ttl = hint.get("ttl") if isinstance(hint, dict) else None
+        if ttl is None:
+            ttl = self.config.tool_cache_ttl
+        if ttl is not None and ttl <= 0:
+            return
         
-    Returns:
-        List of tasks matching the filters
-    """
-    arguments = {"limit": limit}
-    
-    if project_name:
-        arguments["projectName"] = project_name
-    
-    if status:
-        arguments["status"] = status
-    
-    if assigned_to:
-        arguments["assignedTo"] = assigned_to
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._tool_cache[cache_key] = (expires_at, result)
+        self._tool_cache.move_to_end(cache_key)
+        if len(self._tool_cache) > self.config.tool_cache_size:
+            self._tool_cache.popitem(last=False)
     
-    return await client.call_tool("listTasks", arguments)
-
-
-async def get_project_status_via_mcp(
-    client: MCPClient,
-    project_name: str
-) -> Dict[str, Any]:
-    """
-    Get comprehensive project status by combining multiple MCP calls
+    async def call_tool_stream(
+        self,
+        tool_name: str,
+        arguments: Union[Dict[str, Any], bytes]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Call a tool and yield its result content blocks as they arrive
+        
+        For tools with large results (e.g. parsePRP), the first block can be
+        processed while the rest is still in flight, and the full body is never
+        held in memory. Without ijson installed the body is buffered and parsed
+        at once, yielding the same blocks. Results are never cached or retried.
+        
+        Args:
+            tool_name: Name of the tool to call
+            arguments: Tool arguments as a dictionary, or already-serialized JSON bytes
+            
+        Yields:
+            Entries of the result's content list, in order
+        """
+        import httpx
+        
+        self._check_call(tool_name, arguments)
+        if time.monotonic() < self._breaker["open_until"]:
+            raise MCPClientError(f"Circuit open for {self.config.server_url}; not calling '{tool_name}'")
+        
+        try:
+            logger.info("Streaming MCP tool: %s with args: %s", tool_name, arguments)
+            
+            async with self.client.stream(
+                "POST",
+                f"{self.config.server_url}/tools/call",
+                content=_call_payload(tool_name, arguments),
+                headers=self._headers
+            ) as response:
+                self._record_status(response)
+                response.raise_for_status()
+                
+                if ijson is None:
+                    data = _json_loads(await response.aread())
+                    if "error" in data:
+                        error_msg = data["error"].get("message", "Unknown MCP error")
+                        raise MCPServerError(f"Tool '{tool_name}' failed: {error_msg}")
+                    for block in data.get("result", {}).get("content", []):
+                        yield block
+                    return
+                
+                events = ijson.sendable_list()
+                parser = ijson.parse_coro(events)
+                stream = _ContentStream()
+                chunks = response.aiter_bytes()
+                while True:
+                    chunk = await anext(chunks, None)
+                    if chunk is None:
+                        parser.close()  # flushes the events for the final tokens
+                    else:
+                        parser.send(chunk)
+                    
+                    blocks = stream.feed(events)
+                    del events[:]
+                    if stream.error is not None:
+                        error_msg = stream.error.get("message", "Unknown MCP error")
+                        raise MCPServerError(f"Tool '{tool_name}' failed: {error_msg}")
+                    for block in blocks:
+                        yield block
+                    
+                    if chunk is None:
+                        break
+            
+            logger.info("Tool '%s' stream completed", tool_name)
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                raise MCPAuthenticationError(f"Authentication failed for tool '{tool_name}'")
+            elif e.response.status_code == 404:
+                raise MCPClientError(f"Tool '{tool_name}' not found on server")
+            raise MCPClientError(f"HTTP error calling tool '{tool_name}': {e}")
+        except httpx.TransportError as e:
+            self._record_failure()
+            invalidate_tools(self.config.server_url)
+            raise MCPClientError(f"Connection error calling tool '{tool_name}': {e}")
+        except MCPClientError:
+            raise
+        except Exception as e:
+            raise MCPClientError(f"Failed to call tool '{tool_name}': {e}")
     
-    Args:
-        client: MCP client instance
-        project_name: Project name to get status for
+    async def call_tools_batch(
+        self,
+        requests: List[Tuple[str, Dict[str, Any]]],
+        return_exceptions: bool = False
+    ) -> List[Union[Dict[str, Any], MCPClientError]]:
+        """
+        Call several tools in a single JSON-RPC batch request
         
-    Returns:
-        Combined project status with tasks, documentation, and metrics
-    """
-    try:
-        # Get tasks for the project
-        tasks_result = await list_tasks_via_mcp(client, project_name=project_name)
+        Args:
+            requests: (tool_name, arguments) pairs to call
+            return_exceptions: Return failed calls as MCPServerError entries
+                instead of raising on the first one
+            
+        Returns:
+            Tool results in the same order as the requests
+        """
+        import httpx
+        
+        if not requests:
+            return []
+        
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "tools/call",
+                "params": {"name": name, "arguments": arguments}
+            }
+            for i, (name, arguments) in enumerate(requests)
+        ]
+        tool_names = ", ".join(name for name, _ in requests)
         
-        # Get documentation for the project (assuming there's a listDocumentation tool)
         try:
-            docs_result = await client.call_tool("listDocumentation", {"projectName": project_name})
+            logger.info("Calling %d MCP tools in one batch: %s", len(batch), tool_names)
+            
+            response = await self._post(
+                "/tools/call",
+                _json_dumps(batch),
+                idempotent=all(name in _IDEMPOTENT_TOOLS for name, _ in requests)
+            )
+            response.raise_for_status()
+            
+            data = _json_loads(response.content)
+            if isinstance(data, dict):
+                # Servers reject a whole batch with a single error object
+                error_msg = data.get("error", {}).get("message", "Unknown MCP error")
+                raise MCPServerError(f"Batch call failed: {error_msg}")
+            
+            # Batch responses may arrive in any order; match them back up by id
+            by_id = {item.get("id"): item for item in data}
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                raise MCPAuthenticationError(f"Authentication failed for batch: {tool_names}")
+            raise MCPClientError(f"HTTP error calling batch ({tool_names}): {e}")
+        except httpx.TransportError as e:
+            invalidate_tools(self.config.server_url)
+            raise MCPClientError(f"Connection error calling batch ({tool_names}): {e}")
         except MCPClientError:
-            # Fallback if listDocumentation doesn't exist
-            docs_result = {"content": [{"text": "Documentation listing not available"}]}
+            raise
+        except Exception as e:
+            raise MCPClientError(f"Failed to call batch ({tool_names}): {e}")
         
-        # Combine the results
-        return {
-            "project_name": project_name,
-            "tasks": tasks_result,
-            "documentation": docs_result,
-            "status": "active"
-        }
+        results = []
+        for i, (name, _) in enumerate(requests):
+            item = by_id.get(i)
+            if item is None:
+                error = MCPServerError(f"Tool '{name}' failed: no response in batch")
+            elif "error" in item:
+                error_msg = item["error"].get("message", "Unknown MCP error")
+                error = MCPServerError(f"Tool '{name}' failed: {error_msg}")
+            else:
+                results.append(item.get("result", {}))
+                continue
+            
+            if not return_exceptions:
+                raise error
+            results.append(error)
         
-    except Exception as e:
-        raise MCPClientError(f"Failed to get project status for '{project_name}': {e}")
\ No newline at end of file
+        return results
+    
+    async def close(self):
+        """Release the shared HTTP client (closed once its last user releases it)"""
+        if not self._released:
+            self._released = True
+            await _release_client(self._transport_key)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,471 @@
+"""
+Shared clients and convenience functions for the MCP client
+
+get_shared_client() hands out one ready MCPClient per server and event loop;
+the *_via_mcp functions wrap the Deepify server's tools with typed arguments.
+"""
+
+import asyncio
+import hashlib
+import logging
+import weakref
+from typing import Dict, Any, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing_extensions import Annotated, Literal, TypedDict
+
+from .mcp_client import MCPClient, MCPClientConfig, MCPClientError, MCPServerError
+from .mcp_transport import _json_loads
+
+logger = logging.getLogger(__name__)
+
+
+def docs_unavailable() -> Dict[str, Any]:
+    """Stand-in documentation result for servers without a listDocumentation tool"""
+    # A new dict per call, so a caller editing its result can't change later ones
+    return {"content": [{"text": "Documentation listing not available"}]}
+
+
+# Ready-to-use clients shared by every agent and script on an event loop, keyed by
+# (loop, server_url, github_token) since auth headers are per client and the
+# underlying connection pools can't outlive their loop
+_CLIENT_CACHE: Dict[Tuple[asyncio.AbstractEventLoop, str, Optional[str]], MCPClient] = {}
+# Created on first use per loop; an asyncio.Lock can't be shared across loops
+_CACHE_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+_CLIENT_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def _cache_lock() -> asyncio.Lock:
+    """Get the shared-client cache lock for the running loop"""
+    loop = asyncio.get_running_loop()
+    lock = _CACHE_LOCKS.get(loop)
+    if lock is None:
+        lock = _CACHE_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+
+def _drop_closed_loop_clients() -> None:
+    """Forget clients whose event loop has closed; they can no longer be used or closed"""
+    for key in [key for key in _CLIENT_CACHE if key[0].is_closed()]:
+        del _CLIENT_CACHE[key]
+
+
+async def get_shared_client(config: MCPClientConfig) -> MCPClient:
+    """
+    Get the shared MCP client for a server on the running loop, creating it on first use
+    
+    Call close_shared_clients() once on shutdown instead of closing the
+    returned client.
+    
+    Args:
+        config: Client configuration
+        
+    Returns:
+        Ready-to-use MCP client
+        
+    Raises:
+        MCPClientError: If the server already has a shared client with
+            different settings
+    """
+    key = (asyncio.get_running_loop(), config.server_url, config.github_token)
+    async with _cache_lock():
+        _drop_closed_loop_clients()
+        client = _CLIENT_CACHE.get(key)
+        if client is not None:
+            if client.config != config:
+                raise MCPClientError(
+                    f"A shared client for {config.server_url} already exists with different "
+                    "settings; reuse its config or create an MCPClient directly"
+                )
+            _CLIENT_CACHE_STATS["hits"] += 1
+            return client
+        
+        _CLIENT_CACHE_STATS["misses"] += 1
+        client = MCPClient(config)
+        await client.__aenter__()
+        _CLIENT_CACHE[key] = client
+        return client
+
+
+async def close_shared_clients() -> None:
+    """Close every shared client on the running loop; call once on application shutdown"""
+    loop = asyncio.get_running_loop()
+    async with _cache_lock():
+        _drop_closed_loop_clients()
+        keys = [key for key in _CLIENT_CACHE if key[0] is loop]
+        clients = [_CLIENT_CACHE.pop(key) for key in keys]
+    
+    for client in clients:
+        await client.__aexit__(None, None, None)
+
+
+def get_shared_client_stats() -> Dict[str, int]:
+    """Get shared client cache hits, misses and current size (for debugging)"""
+    return {**_CLIENT_CACHE_STATS, "size": len(_CLIENT_CACHE)}
+
+
+def _result_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the structured data from a tool result
+    
+    MCP tools return an envelope ({"content": [...], "isError": ...}); the data
+    itself is the JSON text of the first content block. Results without a
+    content list are already the data.
+    
+    Args:
+        result: Tool result returned by the MCP server
+        
+    Returns:
+        The decoded payload
+    """
+    if result.get("isError"):
+        raise MCPServerError(f"Tool reported an error: {result.get('content')}")
+    
+    content = result.get("content")
+    if not isinstance(content, list):
+        return result
+    
+    text = next((block.get("text") for block in content if block.get("type", "text") == "text"), None)
+    if text is None:
+        raise MCPClientError("Tool result has no text content to build a model from")
+    try:
+        payload = _json_loads(text)
+    except ValueError as e:
+        raise MCPClientError(f"Tool result text is not JSON: {e}") from e
+    if not isinstance(payload, dict):
+        raise MCPClientError("Tool result JSON is not an object")
+    return payload
+
+
+def _build_response(
+    result: Dict[str, Any],
+    response_model: Optional[Type[BaseModel]]
+) -> Union[Dict[str, Any], BaseModel]:
+    """
+    Wrap a tool result in a model, skipping validation for our trusted server
+    
+    Args:
+        result: Tool result returned by the MCP server
+        response_model: Model to build from the result's payload, or None to
+            return the raw result
+        
+    Returns:
+        The raw result or a model instance
+    """
+    if response_model is None:
+        return result
+    
+    payload = _result_payload(result)
+    # model_construct skips custom validators too, so only use it for plain models
+    decorators = response_model.__pydantic_decorators__
+    if decorators.field_validators or decorators.model_validators:
+        return response_model.model_validate(payload)
+    return response_model.model_construct(**payload)
+
+
+# Argument shapes of the write tools, checked locally so bad input fails
+# before a round-trip instead of being rejected by the server after one
+_Level = Literal["low", "medium", "high", "critical"]
+
+
+class _CreateTaskArgs(TypedDict, total=False):
+    title: str
+    description: str
+    projectName: str
+    priority: _Level
+    estimatedHours: Annotated[int, Field(ge=0)]
+    assignedTo: str
+    tags: List[str]
+
+
+class _CreateDocumentationArgs(TypedDict, total=False):
+    title: str
+    content: str
+    type: Literal["guide", "reference", "api", "tutorial", "spec", "readme", "changelog"]
+    projectName: str
+    importance: _Level
+    tags: List[str]
+    contentSha256: str
+
+
+# Compiled once at import; validating a call is then a single pydantic-core pass
+_TASK_ADAPTER = TypeAdapter(_CreateTaskArgs)
+_DOCUMENTATION_ADAPTER = TypeAdapter(_CreateDocumentationArgs)
+
+
+def _validate_arguments(tool_name: str, adapter: TypeAdapter, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check tool arguments against their local schema
+    
+    Args:
+        tool_name: Tool the arguments are for, used in the error message
+        adapter: Compiled adapter for the tool's argument shape
+        arguments: Arguments to check
+        
+    Returns:
+        The validated (and coerced) arguments
+    """
+    try:
+        return adapter.validate_python(arguments)
+    except ValidationError as e:
+        raise MCPClientError(f"Invalid arguments for {tool_name}: {e}") from e
+
+
+# Convenience functions for specific MCP tools
+async def parse_prp_via_mcp(
+    client: MCPClient,
+    prp_content: str,
+    project_name: Optional[str] = None,
+    project_context: Optional[str] = None,
+    response_model: Optional[Type[BaseModel]] = None
+) -> Union[Dict[str, Any], BaseModel]:
+    """
+    Parse a PRP using the MCP server's parsePRP tool
+    
+    Args:
+        client: MCP client instance
+        prp_content: The PRP content to parse
+        project_name: Optional project name
+        project_context: Optional project context
+        response_model: Optional model to build from the trusted result
+        
+    Returns:
+        Parsed PRP data with tasks, documentation, and metadata
+    """
+    # One pass over (key, value) pairs; unset optionals (None, "" or []) are left out
+    arguments = {
+        key: value for key, value in (
+            ("prpContent", prp_content),
+            ("projectName", project_name or None),
+            ("projectContext", project_context or None)
+        ) if value is not None
+    }
+    
+    result = await client.call_tool("parsePRP", arguments)
+    return _build_response(result, response_model)
+
+
+async def create_task_via_mcp(
+    client: MCPClient,
+    title: str,
+    description: str,
+    project_name: str,
+    priority: str = "medium",
+    estimated_hours: Optional[int] = None,
+    assigned_to: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    response_model: Optional[Type[BaseModel]] = None
+) -> Union[Dict[str, Any], BaseModel]:
+    """
+    Create a task using the MCP server's createTask tool
+    
+    Args:
+        client: MCP client instance
+        title: Task title
+        description: Task description
+        project_name: Project name
+        priority: Task priority (low, medium, high, critical)
+        estimated_hours: Estimated hours to complete
+        assigned_to: GitHub username to assign task to
+        tags: List of tags to associate with task
+        response_model: Optional model to build from the trusted result
+        
+    Returns:
+        Created task data
+    """
+    arguments = _task_arguments(
+        title, description, project_name, priority, estimated_hours, assigned_to, tags
+    )
+    result = await client.call_tool("createTask", arguments)
+    return _build_response(result, response_model)
+
+
+def _task_arguments(
+    title: str,
+    description: str,
+    project_name: str,
+    priority: str = "medium",
+    estimated_hours: Optional[int] = None,
+    assigned_to: Optional[str] = None,
+    tags: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Build and validate createTask arguments from snake_case task fields"""
+    # One pass over (key, value) pairs; unset optionals (None, "" or []) are left out
+    arguments = {
+        key: value for key, value in (
+            ("title", title),
+            ("description", description),
+            ("projectName", project_name),
+            ("priority", priority),
+            ("estimatedHours", estimated_hours),
+            ("assignedTo", assigned_to or None),
+            ("tags", tags or None)
+        ) if value is not None
+    }
+    
+    return _validate_arguments("createTask", _TASK_ADAPTER, arguments)
+
+
+async def create_tasks_via_mcp(
+    client: MCPClient,
+    tasks: List[Dict[str, Any]],
+    return_exceptions: bool = False
+) -> List[Union[Dict[str, Any], MCPClientError]]:
+    """
+    Create several tasks in one JSON-RPC batch request
+    
+    Use this when the task list is known up front (e.g. from parsePRP output):
+    N tasks cost one round trip instead of N.
+    
+    Args:
+        client: MCP client instance
+        tasks: Keyword arguments for each task, as accepted by create_task_via_mcp
+            (title, description, project_name, priority, ...)
+        return_exceptions: Return failed creations as MCPServerError entries
+            instead of raising on the first one
+        
+    Returns:
+        Created task data in the same order as tasks
+    """
+    # Validate everything before sending so one bad task doesn't waste the batch
+    calls = [("createTask", _task_arguments(**task)) for task in tasks]
+    return await client.call_tools_batch(calls, return_exceptions=return_exceptions)
+
+
+async def create_documentation_via_mcp(
+    client: MCPClient,
+    title: str,
+    content: str,
+    doc_type: str,
+    project_name: str,
+    importance: str = "medium",
+    tags: Optional[List[str]] = None,
+    response_model: Optional[Type[BaseModel]] = None,
+    include_content_hash: Optional[bool] = None
+) -> Union[Dict[str, Any], BaseModel]:
+    """
+    Create documentation using the MCP server's createDocumentation tool
+    
+    Args:
+        client: MCP client instance
+        title: Documentation title
+        content: Documentation content
+        doc_type: Type of documentation (guide, reference, api, etc.)
+        project_name: Project name
+        importance: Documentation importance (low, medium, high, critical)
+        tags: List of tags to associate with documentation
+        response_model: Optional model to build from the trusted result
+        include_content_hash: Send a contentSha256 so the server can skip content
+            it already stores; by default only when the client's discovered
+            schema for createDocumentation declares it
+        
+    Returns:
+        Created documentation data
+    """
+    if include_content_hash is None:
+        # Servers with a strict schema reject undeclared arguments
+        include_content_hash = client.has_tool("createDocumentation") and "contentSha256" in (
+            client.get_tool_schema("createDocumentation").get("inputSchema", {}).get("properties", {})
+        )
+    
+    # One pass over (key, value) pairs; unset optionals (None, "" or []) are left out
+    arguments = {
+        key: value for key, value in (
+            ("title", title),
+            ("content", content),
+            ("type", doc_type),
+            ("projectName", project_name),
+            ("importance", importance),
+            ("tags", tags or None),
+            (
+                "contentSha256",
+                hashlib.sha256(content.encode("utf-8")).hexdigest() if include_content_hash else None
+            )
+        ) if value is not None
+    }
+    
+    arguments = _validate_arguments("createDocumentation", _DOCUMENTATION_ADAPTER, arguments)
+    result = await client.call_tool("createDocumentation", arguments)
+    return _build_response(result, response_model)
+
+
+async def list_tasks_via_mcp(
+    client: MCPClient,
+    project_name: Optional[str] = None,
+    status: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    limit: int = 50,
+    response_model: Optional[Type[BaseModel]] = None
+) -> Union[Dict[str, Any], BaseModel]:
+    """
+    List tasks using the MCP server's listTasks tool
+    
+    Args:
+        client: MCP client instance
+        project_name: Filter by project name
+        status: Filter by task status
+        assigned_to: Filter by assignee
+        limit: Maximum number of tasks to return
+        response_model: Optional model to build from the trusted result
+        
+    Returns:
+        List of tasks matching the filters
+    """
+    # One pass over (key, value) pairs; unset optionals (None, "" or []) are left out
+    arguments = {
+        key: value for key, value in (
+            ("limit", limit),
+            ("projectName", project_name or None),
+            ("status", status or None),
+            ("assignedTo", assigned_to or None)
+        ) if value is not None
+    }
+    
+    result = await client.call_tool("listTasks", arguments)
+    return _build_response(result, response_model)
+
+
+async def get_project_status_via_mcp(
+    client: MCPClient,
+    project_name: str
+) -> Dict[str, Any]:
+    """
+    Get comprehensive project status by combining multiple MCP calls
+    
+    Args:
+        client: MCP client instance
+        project_name: Project name to get status for
+        
+    Returns:
+        Combined project status with tasks, documentation, and metrics
+    """
+    try:
+        # Tasks and documentation are independent, so fetch them concurrently
+        # (assuming there's a listDocumentation tool)
+        tasks_result, docs_result = await asyncio.gather(
+            list_tasks_via_mcp(client, project_name=project_name),
+            client.call_tool("listDocumentation", {"projectName": project_name}),
+            return_exceptions=True
+        )
+        
+        if isinstance(tasks_result, BaseException):
+            raise tasks_result
+        
+        if isinstance(docs_result, MCPClientError):
+            # Fallback if listDocumentation doesn't exist
+            docs_result = docs_unavailable()
+        elif isinstance(docs_result, BaseException):
+            raise docs_result
+        
+        # Combine the results
+        return {
+            "project_name": project_name,
+            "tasks": tasks_result,
+            "documentation": docs_result,
+            "status": "active"
+        }
+        
+    except Exception as e:
+        raise MCPClientError(f"Failed to get project status for '{project_name}': {e}")
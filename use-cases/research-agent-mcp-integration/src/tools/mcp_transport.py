@@ -0,0 +1,341 @@
+"""
+HTTP transport for the MCP client
+
+Request serialization, the pooled httpx clients shared between MCPClients,
+and the retrying POST with its per-server circuit breaker.
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple, Union
+from dataclasses import dataclass
+
+# httpx (and h11/anyio/certifi behind it) is imported where a client is actually
+# built or used, so importing this module for its config and helpers stays cheap
+if TYPE_CHECKING:
+    import httpx
+
+try:
+    import orjson
+except ImportError:  # optional C parser; the stdlib handles everything it does
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# httpx refuses to build an HTTP/2 client without the h2 package; degrade to
+# pooled HTTP/1.1 keep-alive rather than failing when the extra is missing
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Only advertise brotli when a decoder is installed; httpx can't decode it otherwise
+_ACCEPT_ENCODING = (
+    "br, gzip"
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi")
+    else "gzip"
+)
+
+# Circuit breaker state per server, shared by every client talking to it:
+# server_url -> {"fails": consecutive failures, "open_until": monotonic time}
+_BREAKERS: Dict[str, Dict[str, float]] = {}
+
+# Pooled HTTP clients shared by every MCPClient for the same server and transport
+# settings, so TLS sessions and DNS lookups are amortized process-wide:
+# _transport_key(config) -> (client, refcount)
+_SHARED_CLIENTS: Dict[Tuple[Any, ...], Tuple["httpx.AsyncClient", int]] = {}
+
+# Backoff bounds (seconds) for retried idempotent requests
+_RETRY_BASE_DELAY = 0.2
+_RETRY_MAX_DELAY = 5.0
+
+
+def install_uvloop() -> bool:
+    """
+    Make uvloop the event loop policy when it is installed
+    
+    Call before asyncio.run(); short tools/call round-trips spend a noticeable
+    share of their time in the default loop's per-await overhead.
+    
+    Returns:
+        True if uvloop was installed, False if the default loop stays in use
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
+
+
+def _json_dumps(data: Any, sort_keys: bool = False) -> bytes:
+    """Serialize a JSON-RPC payload straight to request body bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    # Match orjson's compact output so bodies are the same size either way
+    return json.dumps(
+        data, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys
+    ).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a response body from bytes, skipping the intermediate str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# The discovery request never changes, so serialize it once
+_TOOLS_LIST_BODY = _json_dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}})
+_PING_BODY = _json_dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"})
+_RESOURCES_LIST_BODY = _json_dumps({"jsonrpc": "2.0", "id": 1, "method": "resources/list", "params": {}})
+
+# Fixed parts of a tools/call request; only the tool name and arguments vary
+_CALL_ENVELOPE_PREFIX = b'{"jsonrpc":"2.0","id":1,"method":"tools/call","params":{"name":'
+_CALL_ENVELOPE_MID = b',"arguments":'
+_CALL_ENVELOPE_SUFFIX = b'}}'
+
+
+def _call_payload(tool_name: str, arguments: Union[Dict[str, Any], bytes]) -> bytes:
+    """Splice the tool name and arguments into the pre-serialized tools/call envelope"""
+    return b"".join((
+        _CALL_ENVELOPE_PREFIX,
+        _json_dumps(tool_name),
+        _CALL_ENVELOPE_MID,
+        arguments if isinstance(arguments, bytes) else _json_dumps(arguments),
+        _CALL_ENVELOPE_SUFFIX
+    ))
+
+
+@dataclass
+class MCPClientConfig:
+    """Configuration for MCP client connection"""
+    server_url: str
+    github_token: Optional[str] = None
+    timeout: int = 30
+    max_retries: int = 3
+    # Connection pool bounds, so concurrent agent tool calls reuse sockets
+    # instead of exhausting them
+    max_connections: int = 200
+    max_keepalive_connections: int = 100
+    keepalive_expiry: float = 30.0
+    # Tool catalogs only change when the server is redeployed, so discovery
+    # results are shared across clients for this many seconds
+    tools_cache_ttl: float = 60.0
+    # Set to False to send tools/list on every discovery (e.g. while iterating
+    # on a server's tool definitions)
+    use_tools_cache: bool = True
+    # Opt-in LRU of tool results, for workflows that repeat identical
+    # read-only calls; see MCPClient.call_tool
+    use_tool_cache: bool = False
+    tool_cache_size: int = 256
+    # Seconds a cached result stays valid unless the server's _meta.cache_hint
+    # says otherwise; None keeps entries until the LRU evicts them
+    tool_cache_ttl: Optional[float] = None
+    # Discovery doubles as the health probe, so it gets a tighter deadline than
+    # tool calls (capped at timeout)
+    discovery_timeout: float = 5.0
+    # After this many consecutive failed requests, fail fast for the cooldown
+    # instead of tying up pooled connections on a wedged server
+    breaker_threshold: int = 3
+    breaker_cooldown: float = 30.0
+
+
+class MCPClientError(Exception):
+    """Base exception for MCP client errors"""
+    pass
+
+
+class MCPAuthenticationError(MCPClientError):
+    """Authentication failed with MCP server"""
+    pass
+
+
+class MCPServerError(MCPClientError):
+    """MCP server returned an error"""
+    pass
+
+
+def _breaker_state(server_url: str) -> Dict[str, float]:
+    """Get the circuit breaker state shared by every client of a server"""
+    return _BREAKERS.setdefault(server_url, {"fails": 0, "open_until": 0.0})
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Get the running event loop, or None when called outside one"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _transport_key(config: MCPClientConfig) -> Tuple[Any, ...]:
+    """
+    Key for the settings baked into a pooled HTTP client; clients only share on a match
+    
+    httpx connection pools are bound to the event loop that first uses them, so
+    the running loop is part of the key as well.
+    """
+    return (
+        _running_loop(),
+        config.server_url,
+        config.timeout,
+        config.max_retries,
+        config.max_connections,
+        config.max_keepalive_connections,
+        config.keepalive_expiry
+    )
+
+
+def _acquire_client(config: MCPClientConfig) -> "httpx.AsyncClient":
+    """
+    Get the shared HTTP client for a server, creating it on first use
+    
+    Configs for the same server only share a client when their timeout,
+    retries and pool limits match. There is no await between the lookup and
+    the refcount update, so this is atomic on the event loop without a lock.
+    
+    Args:
+        config: Client configuration
+        
+    Returns:
+        Pooled httpx client for config.server_url
+    """
+    import httpx
+    
+    # Clients left over from a finished asyncio.run() can't be used or closed
+    # any more; forget them so the server gets a fresh pool on this loop
+    for stale in [key for key in _SHARED_CLIENTS if key[0] is not None and key[0].is_closed()]:
+        del _SHARED_CLIENTS[stale]
+    
+    key = _transport_key(config)
+    entry = _SHARED_CLIENTS.get(key)
+    if entry is not None:
+        client, refs = entry
+        _SHARED_CLIENTS[key] = (client, refs + 1)
+        return client
+    
+    # The transport retries failed connection attempts (nothing was sent yet);
+    # idempotent calls additionally retry mid-request failures in _post()
+    transport = httpx.AsyncHTTPTransport(
+        retries=config.max_retries,
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry
+        )
+    )
+    client = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(config.timeout))
+    _SHARED_CLIENTS[key] = (client, 1)
+    return client
+
+
+async def _release_client(key: Tuple[Any, ...]) -> None:
+    """Drop one reference to a shared client, closing it on the last one"""
+    entry = _SHARED_CLIENTS.get(key)
+    if entry is None:
+        return
+    
+    client, refs = entry
+    if refs > 1:
+        _SHARED_CLIENTS[key] = (client, refs - 1)
+        return
+    
+    del _SHARED_CLIENTS[key]
+    await client.aclose()
+
+
+class _MCPTransport:
+    """
+    Request plumbing for MCPClient: auth headers, retried POSTs and the circuit breaker.
+    
+    Expects config, client, _headers and _breaker to be set by MCPClient.__init__.
+    """
+    
+    def _get_headers(self) -> Dict[str, str]:
+        """Get HTTP headers for MCP requests"""
+        headers = {
+            "Content-Type": "application/json",
+            "Accept-Encoding": _ACCEPT_ENCODING,
+            "User-Agent": "Research-Agent-MCP-Client/1.0"
+        }
+        
+        if self.config.github_token:
+            headers["Authorization"] = f"Bearer {self.config.github_token}"
+        
+        return headers
+    
+    async def _post(self, path: str, content: bytes, idempotent: bool = False) -> "httpx.Response":
+        """
+        POST a JSON-RPC body, retrying transport failures with exponential backoff
+        
+        Args:
+            path: Endpoint path below the server URL
+            content: Serialized request body
+            idempotent: Whether the request is safe to re-send
+            
+        Returns:
+            HTTP response
+        """
+        import httpx
+        
+        if time.monotonic() < self._breaker["open_until"]:
+            raise MCPClientError(f"Circuit open for {self.config.server_url}; not calling {path}")
+        
+        attempts = self.config.max_retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            try:
+                response = await self.client.post(
+                    f"{self.config.server_url}{path}",
+                    content=content,
+                    headers=self._headers
+                )
+                self._record_status(response)
+                return response
+            except httpx.TransportError as e:
+                # Connect failures were already retried by the transport
+                if attempt == attempts - 1 or isinstance(e, httpx.ConnectError):
+                    self._record_failure()
+                    raise
+                delay = min(_RETRY_BASE_DELAY * 2 ** attempt, _RETRY_MAX_DELAY)
+                logger.warning("Retrying %s after transport error: %s", path, e)
+                # Full jitter so concurrent retries don't hit the server in lockstep
+                await asyncio.sleep(random.uniform(0, delay))
+    
+    def _record_status(self, response: "httpx.Response") -> None:
+        """Count a 5xx response as a failure; any other status closes the circuit"""
+        if response.status_code >= 500:
+            self._record_failure()
+        else:
+            self._breaker["fails"] = 0
+    
+    def _record_failure(self) -> None:
+        """Count a failed request, opening the circuit once the threshold is reached"""
+        self._breaker["fails"] += 1
+        if self._breaker["fails"] >= self.config.breaker_threshold:
+            self._breaker["open_until"] = time.monotonic() + self.config.breaker_cooldown
+            logger.warning(
+                "Opening circuit for %s for %.0fs after %d consecutive failures",
+                self.config.server_url, self.config.breaker_cooldown, self._breaker["fails"]
+            )
+    
+    async def _rpc(self, path: str, body: bytes) -> Dict[str, Any]:
+        """POST an idempotent JSON-RPC request and return its result object"""
+        import httpx
+        
+        try:
+            response = await self._post(path, body, idempotent=True)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                raise MCPAuthenticationError("GitHub authentication required for MCP server")
+            raise MCPClientError(f"HTTP error calling {path}: {e}")
+        except httpx.TransportError as e:
+            raise MCPClientError(f"Connection error calling {path}: {e}")
+        
+        data = _json_loads(response.content)
+        if "error" in data:
+            raise MCPServerError(f"{path} failed: {data['error']}")
+        return data.get("result", {})
@@ -0,0 +1,173 @@
+"""
+Batch and sectioned PRP generation
+
+Alternatives to PRPWriter's single streamed generation: the Message Batches
+API for cheap offline runs, and one concurrent request per PRP section for
+lower end-to-end latency.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List
+
+from .prp_writer import PRPWriter, PRPWriterError, ResearchInput
+from .prp_prompts import (
+    _PROMPT_CACHING_HEADERS, _PRP_SECTIONS, _END_MARKER, _cached_block, _log_cache_usage
+)
+
+logger = logging.getLogger(__name__)
+
+# Message Batches are beta on the pinned SDK; prompt caching still applies inside a batch
+_BATCH_BETAS = ["message-batches-2024-09-24", "prompt-caching-2024-07-31"]
+
+# Output budget for one section of write_prp_sectioned
+_SECTION_MAX_TOKENS = 500
+
+
+class BatchPRPWriter(PRPWriter):
+    """
+    PRPWriter that can also generate through the Message Batches API or
+    section by section.
+    """
+    
+    async def write_prp_batch(
+        self,
+        inputs: List[ResearchInput],
+        poll_interval: float = 20.0
+    ) -> List[str]:
+        """
+        Generate several PRPs through the Message Batches API
+        
+        Batches cost half as much as individual calls but complete
+        asynchronously, so use this when latency doesn't matter.
+        
+        Args:
+            inputs: Research data for each PRP
+            poll_interval: Seconds to wait between batch status checks
+            
+        Returns:
+            PRP markdown for each input, in input order
+        """
+        if not inputs:
+            return []
+        
+        try:
+            batches = self.client.beta.messages.batches
+            async with self._limiter, self._sem:
+                batch = await batches.create(
+                    requests=[
+                        {
+                            "custom_id": f"prp-{i}",
+                            "params": {
+                                "model": self.model,
+                                "max_tokens": self._estimate_output_tokens(research_input),
+                                "temperature": 0.7,
+                                "stop_sequences": [_END_MARKER],
+                                "messages": [
+                                    {
+                                        "role": "user",
+                                        # Same cacheable instruction block as single calls
+                                        "content": self._build_prp_prompt(research_input)
+                                    }
+                                ]
+                            }
+                        }
+                        for i, research_input in enumerate(inputs)
+                    ],
+                    betas=_BATCH_BETAS
+                )
+            
+            logger.info("Submitted PRP batch %s (%d requests)", batch.id, len(inputs))
+            
+            while batch.processing_status != "ended":
+                await asyncio.sleep(poll_interval)
+                batch = await batches.retrieve(batch.id)
+            
+            prps: Dict[str, str] = {}
+            failed: List[str] = []
+            async for entry in await batches.results(batch.id):
+                if entry.result.type == "succeeded":
+                    prps[entry.custom_id] = entry.result.message.content[0].text.rstrip()
+                else:
+                    failed.append(entry.custom_id)
+            
+        except Exception as e:
+            raise PRPWriterError(f"Failed to generate PRP batch: {e}")
+        
+        if failed:
+            raise PRPWriterError(f"PRP batch {batch.id} had failed requests: {', '.join(sorted(failed))}")
+        
+        logger.info("PRP batch %s completed", batch.id)
+        return [prps[f"prp-{i}"] for i in range(len(inputs))]
+    
+    async def write_prp_sectioned(self, research_input: ResearchInput) -> str:
+        """
+        Generate a PRP with one concurrent request per section
+        
+        Each section is a short generation, so end-to-end latency is bounded
+        by the slowest section rather than one long serial stream.
+        
+        Args:
+            research_input: Research data and requirements
+            
+        Returns:
+            Complete PRP as a markdown string
+        """
+        # Instructions and research are shared by every section request, so
+        # both go in the cached system prompt; only the section ask differs
+        system = [
+            {"type": "text", "text": self._static_prp_template()},
+            _cached_block(self._dynamic_prp_section(research_input))
+        ]
+        
+        logger.info("Generating sectioned PRP for topic: %s", research_input.topic)
+        
+        try:
+            # The first request writes the prompt cache; the rest are issued
+            # together once it exists so they all read from it
+            first = await self._gen_section(system, *_PRP_SECTIONS[0])
+            rest = await asyncio.gather(*(
+                self._gen_section(system, name, description)
+                for name, description in _PRP_SECTIONS[1:]
+            ))
+        except Exception as e:
+            raise PRPWriterError(f"Failed to generate PRP: {e}")
+        
+        prp_content = "\n\n".join(
+            f"## {i}. {name}\n\n{text.strip()}"
+            for i, ((name, _), text) in enumerate(zip(_PRP_SECTIONS, (first, *rest)), 1)
+        )
+        
+        logger.info("Generated sectioned PRP (%d characters)", len(prp_content))
+        return prp_content
+    
+    async def _gen_section(self, system: List[Dict[str, Any]], name: str, description: str) -> str:
+        """
+        Generate the body of a single PRP section
+        
+        Args:
+            system: Shared system prompt blocks (instructions and research)
+            name: Section name
+            description: What the section should cover
+            
+        Returns:
+            Section text without its heading
+        """
+        async with self._limiter, self._sem:
+            response = await self.client.messages.create(
+                model=self.model,
+                max_tokens=_SECTION_MAX_TOKENS,
+                temperature=0.7,
+                stop_sequences=[_END_MARKER],
+                system=system,
+                messages=[{
+                    "role": "user",
+                    "content": (
+                        f"Write only the **{name}** section of the PRP ({description}). "
+                        "Do not repeat the section heading or write any other section."
+                    )
+                }],
+                extra_headers=_PROMPT_CACHING_HEADERS
+            )
+        _log_cache_usage(response)
+        return response.content[0].text
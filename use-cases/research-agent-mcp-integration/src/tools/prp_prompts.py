@@ -0,0 +1,129 @@
+"""
+Prompt text for the PRP writer
+
+The invariant instruction blocks are sent first and marked for prompt
+caching; the per-call research section follows _RESEARCH_INPUT_DELIMITER.
+"""
+
+import logging
+import string
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Prompt caching is still behind a beta flag on the pinned SDK version
+_PROMPT_CACHING_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+# Instruction scaffolds shared by every call. They are sent as their own
+# content block marked for caching, ahead of the per-topic research data, so
+# repeated generations reuse the cached prefix. (Anthropic only caches
+# prefixes above a model-specific minimum length; shorter blocks are simply
+# billed as normal input.)
+# The PRP sections, in order: (name, what the section covers)
+_PRP_SECTIONS = (
+    ("Project Overview", "Clear description based on research"),
+    ("Goals", "Specific, measurable objectives derived from findings"),
+    ("Target Users", "User personas identified from research"),
+    ("Core Features", "Key functionality based on research insights"),
+    ("Technical Requirements", "Technology stack and architecture considerations"),
+    ("Success Criteria", "Measurable outcomes and KPIs"),
+    ("Timeline & Milestones", "Realistic development phases"),
+    ("Constraints & Assumptions", "Technical and business limitations"),
+    ("Risk Assessment", "Potential challenges and mitigation strategies"),
+)
+
+_PRP_INSTRUCTIONS = """
+You are an expert technical product manager. Based on the research findings provided after these instructions, create a comprehensive Product Requirements Prompt (PRP) following the established format.
+
+# Instructions:
+
+Create a comprehensive PRP that includes:
+
+$sections
+
+## PRP Format Requirements:
+
+- Use clear, actionable language
+- Include specific technical details from research
+- Provide realistic time estimates for tasks
+- Organize features by priority (Must-have, Should-have, Could-have)
+- Reference research sources where relevant
+- Make it comprehensive enough for AI to extract specific tasks
+
+## Research-Based Requirements:
+- Incorporate latest best practices found in research
+- Address common challenges mentioned in sources
+- Leverage recommended tools and technologies
+- Include performance and security considerations from research
+
+Generate a complete, actionable PRP that an AI system could parse to extract specific development tasks, documentation needs, and project structure.
+
+When you are done, end your response with a line containing only ---END---
+"""
+_PRP_INSTRUCTIONS = string.Template(_PRP_INSTRUCTIONS).substitute(sections="\n".join(
+    f"{i}. **{name}** - {description}" for i, (name, description) in enumerate(_PRP_SECTIONS, 1)
+))
+
+# The instructions ask the model to finish with this marker; passing it as a
+# stop sequence ends generation there instead of letting the model pad out
+# the max_tokens budget
+_END_MARKER = "---END---"
+
+_INSIGHTS_INSTRUCTIONS = """
+Analyze the research results provided after these instructions and extract key insights for product development.
+
+Please provide a structured analysis with:
+
+1. **Key Technologies/Tools** - Most mentioned and recommended
+2. **Best Practices** - Common recommendations across sources
+3. **Common Challenges** - Frequently mentioned problems and solutions
+4. **Performance Considerations** - Speed, scalability, optimization insights
+5. **Security Considerations** - Security best practices and concerns
+6. **Development Workflow** - Recommended development approaches
+7. **Integration Patterns** - How to integrate with other systems
+8. **Testing Strategies** - Recommended testing approaches
+
+Format as JSON with clear categories and actionable insights, then end your response with a line containing only ---END---
+"""
+
+
+# Bounds on the research section: search snippets beyond this length are
+# mostly boilerplate, and past this many sources the PRP doesn't improve
+_MAX_DESC_CHARS = 280
+_MAX_RESULTS = 20
+
+# Separates the invariant instructions from the per-call research data
+_RESEARCH_INPUT_DELIMITER = "\n---\nRESEARCH INPUT:\n"
+
+
+# Skeleton of the per-call research section
+_PRP_INPUT_TEMPLATE = string.Template(_RESEARCH_INPUT_DELIMITER + """
+# Research Topic: $topic
+
+## Research Findings:
+$research
+
+## Additional Context:
+$context
+""")
+
+_RESULT_TEMPLATE = """
+### Source {i}: {title}
+**URL:** {url}
+**Key Points:** {description}
+"""
+
+
+def _cached_block(text: str) -> Dict[str, Any]:
+    """Wrap static prompt text in a content block marked for prompt caching"""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def _log_cache_usage(response: Any) -> None:
+    """Log prompt cache reads/writes so cache hits can be verified"""
+    usage = response.usage
+    logger.info(
+        "Prompt cache: %s tokens read, %s tokens written",
+        getattr(usage, "cache_read_input_tokens", None),
+        getattr(usage, "cache_creation_input_tokens", None)
+    )
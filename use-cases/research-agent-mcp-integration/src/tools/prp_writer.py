@@ -4,14 +4,45 @@ PRP (Product Requirements Prompt) Writer Tool
 Generates comprehensive PRPs from research findings using AI.
 """
 
+import asyncio
+import importlib.util
 import logging
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
-from anthropic import AsyncAnthropic
+from aiolimiter import AsyncLimiter
 import json
 
+from .prp_prompts import (
+    _PROMPT_CACHING_HEADERS, _PRP_INSTRUCTIONS, _INSIGHTS_INSTRUCTIONS, _END_MARKER,
+    _MAX_DESC_CHARS, _MAX_RESULTS, _RESEARCH_INPUT_DELIMITER, _PRP_INPUT_TEMPLATE, _RESULT_TEMPLATE,
+    _cached_block, _log_cache_usage
+)
+
+# The anthropic SDK (and the httpx stack under it) is imported when the first
+# client is built, so importing this module for ResearchInput stays cheap
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+
+try:
+    import orjson
+except ImportError:  # optional C parser; the stdlib handles everything it does
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# (running event loop or None, API key)
+_LoopKey = Tuple[Optional[asyncio.AbstractEventLoop], str]
+
+# Shared Anthropic clients keyed by (event loop, API key), so every PRPWriter
+# (and every convenience call) reuses one pooled connection instead of a new
+# TLS handshake. The httpx pool under each client is bound to the loop that
+# first uses it, so each loop gets its own client
+_ANTHROPIC_CLIENTS: Dict[_LoopKey, "AsyncAnthropic"] = {}
+# Concurrency and rate limits per API key, shared by every writer on that key
+# because account rate limits are per key. Like the clients they are kept per
+# event loop: (loop, api_key) -> (semaphore, limiter)
+_ANTHROPIC_LIMITS: Dict[_LoopKey, Tuple[asyncio.Semaphore, AsyncLimiter]] = {}
+
 
 @dataclass
 class ResearchInput:
@@ -29,133 +60,273 @@ class PRPWriterError(Exception):
     pass
 
 
+def _json_loads(text: str) -> Any:
+    """Parse model output as JSON (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Get the running event loop, or None when called outside one"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _drop_closed_loop_entries() -> None:
+    """Forget clients and limits whose event loop has closed; they can no longer be used"""
+    for cache in (_ANTHROPIC_CLIENTS, _ANTHROPIC_LIMITS):
+        for key in [key for key in cache if key[0] is not None and key[0].is_closed()]:
+            del cache[key]
+
+
+def _get_shared_client(api_key: str) -> "AsyncAnthropic":
+    """
+    Get the shared Anthropic client for an API key on the running loop, creating it on first use
+    
+    Args:
+        api_key: Anthropic API key
+        
+    Returns:
+        AsyncAnthropic client backed by a pooled (HTTP/2 when available) connection
+    """
+    _drop_closed_loop_entries()
+    key = (_running_loop(), api_key)
+    client = _ANTHROPIC_CLIENTS.get(key)
+    if client is None:
+        import httpx
+        from anthropic import AsyncAnthropic
+        
+        http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            # Same generous read timeout as the SDK default; generations are slow
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+        client = _ANTHROPIC_CLIENTS[key] = AsyncAnthropic(api_key=api_key, http_client=http_client)
+    return client
+
+
+async def close_anthropic_clients() -> None:
+    """Close every shared Anthropic client on the running loop; call once on application shutdown"""
+    _drop_closed_loop_entries()
+    loop = asyncio.get_running_loop()
+    keys = [key for key in _ANTHROPIC_CLIENTS if key[0] is loop or key[0] is None]
+    clients = [_ANTHROPIC_CLIENTS.pop(key) for key in keys]
+    
+    for client in clients:
+        await client.close()
+
+
 class PRPWriter:
     """
     AI-powered PRP writer that converts research findings into comprehensive
     Product Requirements Prompts following the established PRP format.
+    
+    Prompts are built static-first: the invariant instructions lead, and
+    everything that varies per call (topic, findings, context) trails after
+    _RESEARCH_INPUT_DELIMITER. Provider prefix caches key on the longest
+    identical prefix, so nothing variable may be moved ahead of it.
     """
     
-    def __init__(self, anthropic_api_key: str, model: str = "claude-3-5-sonnet-20241022"):
-        self.client = AsyncAnthropic(api_key=anthropic_api_key)
+    def __init__(
+        self,
+        anthropic_api_key: str,
+        model: str = "claude-3-5-sonnet-20241022",
+        max_concurrent: int = 4,
+        requests_per_minute: int = 40,
+        max_desc_chars: int = _MAX_DESC_CHARS,
+        max_results: int = _MAX_RESULTS
+    ):
+        """
+        Args:
+            anthropic_api_key: Anthropic API key
+            model: Claude model to generate with
+            max_desc_chars: Longest result description sent to the model
+            max_results: Most (distinct) research results sent to the model
+            max_concurrent: Maximum in-flight requests for this API key
+            requests_per_minute: Client-side request rate cap for this API key
+                (40/min matches the lowest usage tier)
+        
+        The limits are shared by every writer using the same API key on the
+        same event loop; the first writer to send a request there sets them.
+        """
+        self._api_key = anthropic_api_key
         self.model = model
+        self.max_desc_chars = max_desc_chars
+        self.max_results = max_results
+        self._max_concurrent = max_concurrent
+        self._requests_per_minute = requests_per_minute
     
-    async def write_prp_from_research(
+    @property
+    def client(self) -> "AsyncAnthropic":
+        """Shared Anthropic client for this writer's API key on the running loop"""
+        return _get_shared_client(self._api_key)
+    
+    def _limits(self) -> Tuple[asyncio.Semaphore, AsyncLimiter]:
+        """Get the (semaphore, limiter) for this writer's API key on the running loop"""
+        _drop_closed_loop_entries()
+        key = (_running_loop(), self._api_key)
+        limits = _ANTHROPIC_LIMITS.get(key)
+        if limits is None:
+            limits = _ANTHROPIC_LIMITS[key] = (
+                asyncio.Semaphore(self._max_concurrent),
+                AsyncLimiter(self._requests_per_minute, time_period=60)
+            )
+        return limits
+    
+    @property
+    def _sem(self) -> asyncio.Semaphore:
+        """Concurrency limit for this writer's API key on the running loop"""
+        return self._limits()[0]
+    
+    @property
+    def _limiter(self) -> AsyncLimiter:
+        """Request rate limit for this writer's API key on the running loop"""
+        return self._limits()[1]
+    
+    async def write_prp_from_research_stream(
         self,
-        research_input: ResearchInput
-    ) -> str:
+        research_input: ResearchInput,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> AsyncIterator[str]:
         """
-        Generate a comprehensive PRP from research findings
+        Generate a PRP from research findings, yielding text as it arrives
         
         Args:
             research_input: Research data and requirements
+            on_chunk: Optional callback invoked with each chunk (e.g. for progress output)
             
-        Returns:
-            Complete PRP as a markdown string
+        Yields:
+            Successive pieces of the PRP markdown
         """
         try:
             # Create the prompt for PRP generation
-            prompt = self._build_prp_prompt(research_input)
+            content = self._build_prp_prompt(research_input)
             
-            logger.info(f"Generating PRP for topic: {research_input.topic}")
+            logger.info("Generating PRP for topic: %s", research_input.topic)
             
-            # Call Claude to generate the PRP
-            response = await self.client.messages.create(
+            # Stream from Claude so consumers see the first tokens right away,
+            # throttled client-side instead of running into 429s
+            async with self._limiter, self._sem, self.client.messages.stream(
                 model=self.model,
-                max_tokens=4000,
+                max_tokens=self._estimate_output_tokens(research_input),
                 temperature=0.7,
+                stop_sequences=[_END_MARKER],
                 messages=[
                     {
                         "role": "user",
-                        "content": prompt
+                        "content": content
                     }
-                ]
-            )
-            
-            prp_content = response.content[0].text
-            
-            logger.info(f"Generated PRP ({len(prp_content)} characters)")
-            return prp_content
+                ],
+                extra_headers=_PROMPT_CACHING_HEADERS
+            ) as stream:
+                async for text in stream.text_stream:
+                    if on_chunk is not None:
+                        on_chunk(text)
+                    yield text
+                _log_cache_usage(await stream.get_final_message())
             
         except Exception as e:
             raise PRPWriterError(f"Failed to generate PRP: {e}")
     
-    def _build_prp_prompt(self, research_input: ResearchInput) -> str:
+    async def write_prp_from_research(
+        self,
+        research_input: ResearchInput,
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> str:
         """
-        Build the prompt for PRP generation based on research findings
+        Generate a comprehensive PRP from research findings
         
         Args:
             research_input: Research data and requirements
+            on_chunk: Optional callback invoked with each streamed chunk
             
         Returns:
-            Prompt string for Claude
+            Complete PRP as a markdown string
         """
-        # Format research results for the prompt
-        research_summary = self._format_research_results(research_input.research_results)
+        chunks = [chunk async for chunk in self.write_prp_from_research_stream(research_input, on_chunk)]
+        prp_content = "".join(chunks).rstrip()
         
-        prompt = f"""
-You are an expert technical product manager. Based on the research findings below, create a comprehensive Product Requirements Prompt (PRP) following the established format.
-
-# Research Topic: {research_input.topic}
-
-## Research Findings:
-{research_summary}
-
-## Additional Context:
-{self._format_additional_context(research_input)}
-
-# Instructions:
-
-Create a comprehensive PRP that includes:
-
-1. **Project Overview** - Clear description based on research
-2. **Goals** - Specific, measurable objectives derived from findings
-3. **Target Users** - User personas identified from research
-4. **Core Features** - Key functionality based on research insights
-5. **Technical Requirements** - Technology stack and architecture considerations
-6. **Success Criteria** - Measurable outcomes and KPIs
-7. **Timeline & Milestones** - Realistic development phases
-8. **Constraints & Assumptions** - Technical and business limitations
-9. **Risk Assessment** - Potential challenges and mitigation strategies
-
-## PRP Format Requirements:
-
-- Use clear, actionable language
-- Include specific technical details from research
-- Provide realistic time estimates for tasks
-- Organize features by priority (Must-have, Should-have, Could-have)
-- Reference research sources where relevant
-- Make it comprehensive enough for AI to extract specific tasks
-
-## Research-Based Requirements:
-- Incorporate latest best practices found in research
-- Address common challenges mentioned in sources
-- Leverage recommended tools and technologies
-- Include performance and security considerations from research
-
-Generate a complete, actionable PRP that an AI system could parse to extract specific development tasks, documentation needs, and project structure.
-"""
+        logger.info("Generated PRP (%d characters)", len(prp_content))
+        return prp_content
+    
+    def _estimate_output_tokens(self, research_input: ResearchInput) -> int:
+        """Output budget for a full PRP, scaled by how much research it covers"""
+        sources = min(len(research_input.research_results), self.max_results)
+        return min(4000, 800 + 150 * sources)
+    
+    def _estimate_insight_tokens(self, research_results: List[Dict[str, Any]]) -> int:
+        """Output budget for an insights analysis, scaled by the number of results"""
+        sources = min(len(research_results), self.max_results)
+        return min(2000, 300 + 80 * sources)
+    
+    @staticmethod
+    def _static_prp_template() -> str:
+        """Return the invariant PRP instructions (built once at import)"""
+        return _PRP_INSTRUCTIONS
+    
+    def _dynamic_prp_section(self, research_input: ResearchInput) -> str:
+        """
+        Format the per-topic part of the PRP prompt
         
-        return prompt
+        Args:
+            research_input: Research data and requirements
+            
+        Returns:
+            Topic, research findings and additional context
+        """
+        return _PRP_INPUT_TEMPLATE.substitute(
+            topic=research_input.topic,
+            research=self._format_research_results(research_input.research_results),
+            context=self._format_additional_context(research_input)
+        )
+    
+    def _build_prp_prompt(self, research_input: ResearchInput) -> List[Dict[str, Any]]:
+        """
+        Build the prompt for PRP generation based on research findings
+        
+        Args:
+            research_input: Research data and requirements
+            
+        Returns:
+            Message content blocks for Claude: the cacheable instructions
+            first, then the research data
+        """
+        return [
+            _cached_block(self._static_prp_template()),
+            {"type": "text", "text": self._dynamic_prp_section(research_input)}
+        ]
     
     def _format_research_results(self, results: List[Dict[str, Any]]) -> str:
         """Format research results for inclusion in the prompt"""
         if not results:
             return "No specific research results provided."
         
-        formatted_results = []
-        
-        for i, result in enumerate(results, 1):
-            title = result.get("title", "Unknown")
+        # Drop repeated URLs, truncate long snippets and cap the count, keeping
+        # the search API's relevance order for which results make the cut
+        limit = self.max_desc_chars
+        seen = set()
+        rows = []
+        for result in results:
             url = result.get("url", "")
-            description = result.get("description", "No description")
+            if url in seen:
+                continue
+            seen.add(url)
             
-            formatted_results.append(f"""
-### Source {i}: {title}
-**URL:** {url}
-**Key Points:** {description}
-""")
+            description = result.get("description", "No description")
+            if len(description) > limit:
+                description = description[:limit] + "…"
+            rows.append((url, result.get("title", "Unknown"), description))
+            if len(rows) == self.max_results:
+                break
         
-        return "\n".join(formatted_results)
+        return "\n".join(
+            _RESULT_TEMPLATE.format(i=i, title=title, url=url, description=description)
+            for i, (url, title, description) in enumerate(rows, 1)
+        )
     
     def _format_additional_context(self, research_input: ResearchInput) -> str:
         """Format additional context information"""
@@ -192,43 +363,41 @@ Generate a complete, actionable PRP that an AI system could parse to extract spe
         """
         try:
             # Create prompt for insight extraction
-            focus_text = f"Focus specifically on: {', '.join(focus_areas)}" if focus_areas else ""
+            # Always present in the same format, so the message shape doesn't
+            # change depending on whether focus areas were given
+            focus_line = f"Focus areas: {', '.join(focus_areas) if focus_areas else 'none'}"
             research_text = self._format_research_results(research_results)
             
-            prompt = f"""
-Analyze the following research results and extract key insights for product development.
-
-{focus_text}
-
-# Research Results:
-{research_text}
-
-Please provide a structured analysis with:
-
-1. **Key Technologies/Tools** - Most mentioned and recommended
-2. **Best Practices** - Common recommendations across sources
-3. **Common Challenges** - Frequently mentioned problems and solutions
-4. **Performance Considerations** - Speed, scalability, optimization insights
-5. **Security Considerations** - Security best practices and concerns
-6. **Development Workflow** - Recommended development approaches
-7. **Integration Patterns** - How to integrate with other systems
-8. **Testing Strategies** - Recommended testing approaches
-
-Format as JSON with clear categories and actionable insights.
-"""
-            
-            response = await self.client.messages.create(
+            async with self._limiter, self._sem, self.client.messages.stream(
                 model=self.model,
-                max_tokens=2000,
+                max_tokens=self._estimate_insight_tokens(research_results),
                 temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
+                stop_sequences=[_END_MARKER],
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        _cached_block(_INSIGHTS_INSTRUCTIONS),
+                        {
+                            "type": "text",
+                            "text": "\n".join((
+                                _RESEARCH_INPUT_DELIMITER, focus_line, "# Research Results:", research_text
+                            ))
+                        }
+                    ]
+                }],
+                extra_headers=_PROMPT_CACHING_HEADERS
+            ) as stream:
+                # JSON can only be parsed once complete, so buffer the chunks
+                chunks = [text async for text in stream.text_stream]
+                _log_cache_usage(await stream.get_final_message())
+            
+            analysis = "".join(chunks)
             
             # Try to parse as JSON, fallback to text
             try:
-                insights = json.loads(response.content[0].text)
-            except json.JSONDecodeError:
-                insights = {"raw_analysis": response.content[0].text}
+                insights = _json_loads(analysis)
+            except json.JSONDecodeError:  # orjson's error subclasses it
+                insights = {"raw_analysis": analysis}
             
             return insights
             
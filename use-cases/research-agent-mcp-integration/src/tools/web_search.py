@@ -4,18 +4,64 @@ Web Search Tool using Brave Search API
 Provides intelligent web search capabilities for research agents.
 """
 
+import asyncio
 import httpx
+import importlib.util
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 
+from aiolimiter import AsyncLimiter
+
+try:
+    import orjson
+except ImportError:  # optional C parser; the stdlib handles everything it does
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional typed decoder; falls back to orjson/json + dict access
+    msgspec = None
+
 logger = logging.getLogger(__name__)
 
+# Shared tools keyed by (event loop, API key), so repeated searches reuse one
+# pooled keep-alive connection to api.search.brave.com instead of a new TLS
+# handshake. The pool, semaphore and limiter are bound to the loop that first
+# uses them, so each loop gets its own tool
+_WEB_SEARCH_TOOL_CACHE: Dict[Tuple[Optional[asyncio.AbstractEventLoop], str], "WebSearchTool"] = {}
+
+# Result cache bounds: entries kept per tool, and a shorter TTL for
+# past-day searches whose results go stale fastest
+_RESULT_CACHE_SIZE = 512
+_FRESH_RESULTS_TTL = 300
+
+# Brotli packs Brave's JSON tighter than gzip, but httpx can only decode it
+# when a brotli package is installed, so only advertise it then
+_ACCEPT_ENCODING = (
+    "br, gzip"
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi")
+    else "gzip"
+)
+
+# Host part of an http(s) URL; all the analysis needs, without a full urlparse
+_NETLOC_RE = re.compile(r'^https?://([^/:?#]+)')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a response body from bytes, skipping the intermediate str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
-    """Individual search result"""
+    """Individual search result (slotted: up to 20 are built per search)"""
     title: str
     url: str
     description: str
@@ -32,6 +78,56 @@ class SearchResult:
         }
 
 
+if msgspec is not None:
+    # Only the fields we keep; msgspec skips everything else in the (large)
+    # Brave response while decoding, without building dicts for it
+    class _BraveResult(msgspec.Struct):
+        title: str = ""
+        url: str = ""
+        description: str = ""
+        age: Optional[str] = None
+        score: Optional[float] = None
+    
+    class _BraveWeb(msgspec.Struct):
+        results: List[_BraveResult] = []
+    
+    class _BraveResponse(msgspec.Struct):
+        web: _BraveWeb = msgspec.field(default_factory=_BraveWeb)
+    
+    _BRAVE_DECODER = msgspec.json.Decoder(_BraveResponse)
+else:
+    _BRAVE_DECODER = None
+
+
+def _parse_search_results(content: bytes) -> List[SearchResult]:
+    """
+    Decode a Brave web search response body into SearchResults
+    
+    Args:
+        content: Raw response body
+        
+    Returns:
+        One SearchResult per web result
+    """
+    if _BRAVE_DECODER is not None:
+        return [
+            SearchResult(r.title, r.url, r.description, r.age, r.score)
+            for r in _BRAVE_DECODER.decode(content).web.results
+        ]
+    
+    web_results = _json_loads(content).get("web", {}).get("results", [])
+    return [
+        SearchResult(
+            r.get("title", ""),
+            r.get("url", ""),
+            r.get("description", ""),
+            r.get("age"),
+            r.get("score")
+        )
+        for r in web_results
+    ]
+
+
 class WebSearchError(Exception):
     """Base exception for web search errors"""
     pass
@@ -44,13 +140,47 @@ class WebSearchTool:
     Provides intelligent web search with result ranking and filtering.
     """
     
-    def __init__(self, api_key: str, timeout: int = 10):
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 10,
+        max_concurrent: int = 10,
+        requests_per_second: float = 10,
+        cache_ttl: int = 900
+    ):
         self.api_key = api_key
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        
+        # Agents re-run the same searches while refining PRPs, so results are
+        # kept for cache_ttl seconds (LRU-bounded): params -> (fetched_at, results)
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[tuple, Tuple[float, List[SearchResult]]]" = OrderedDict()
+        
+        # Fan-out from the agent is throttled client-side so it doesn't hit
+        # Brave's 429 path. Brave limits per second, so the window is one second:
+        # a longer window would let its whole budget through as a single burst
+        self._sem = asyncio.Semaphore(max_concurrent)
+        self._limiter = AsyncLimiter(requests_per_second, time_period=1)
+        self.client = httpx.AsyncClient(
+            # Concurrent searches multiplex over one connection when h2 is installed
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=60
+            )
+        )
         
         # Brave Search API endpoint
         self.base_url = "https://api.search.brave.com/res/v1"
+        
+        # Same on every request, so build them once
+        self._headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": _ACCEPT_ENCODING,
+            "X-Subscription-Token": self.api_key
+        }
     
     async def search(
         self,
@@ -83,6 +213,15 @@ class WebSearchTool:
             # Validate count
             count = min(max(count, 1), 20)
             
+            key = (query, count, offset, country, search_lang, ui_lang, safesearch, freshness)
+            ttl = _FRESH_RESULTS_TTL if freshness == "pd" else self.cache_ttl
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < ttl:
+                self._cache.move_to_end(key)
+                logger.info("Search cache hit for: '%s'", query)
+                # Fresh list per caller; results themselves are never mutated
+                return list(cached[1])
+            
             # Prepare search parameters
             params = {
                 "q": query,
@@ -97,41 +236,26 @@ class WebSearchTool:
             if freshness:
                 params["freshness"] = freshness
             
-            # Prepare headers
-            headers = {
-                "Accept": "application/json",
-                "Accept-Encoding": "gzip",
-                "X-Subscription-Token": self.api_key
-            }
-            
-            logger.info(f"Searching for: '{query}' (count: {count})")
+            logger.info("Searching for: '%s' (count: %d)", query, count)
             
             # Make the API request
-            response = await self.client.get(
-                f"{self.base_url}/web/search",
-                params=params,
-                headers=headers
-            )
+            async with self._limiter, self._sem:
+                response = await self.client.get(
+                    f"{self.base_url}/web/search",
+                    params=params,
+                    headers=self._headers
+                )
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Parse results
-            results = []
-            web_results = data.get("web", {}).get("results", [])
+            results = _parse_search_results(response.content)
             
-            for result in web_results:
-                search_result = SearchResult(
-                    title=result.get("title", ""),
-                    url=result.get("url", ""),
-                    description=result.get("description", ""),
-                    age=result.get("age"),
-                    score=result.get("score")
-                )
-                results.append(search_result)
+            self._cache[key] = (time.monotonic(), results)
+            self._cache.move_to_end(key)
+            if len(self._cache) > _RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
             
-            logger.info(f"Found {len(results)} results for query: '{query}'")
-            return results
+            logger.info("Found %d results for query: '%s'", len(results), query)
+            return list(results)
             
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 401:
@@ -164,70 +288,67 @@ class WebSearchTool:
             # Perform the search
             results = await self.search(query, count)
             
-            # Filter by score if available
-            if min_score > 0:
-                filtered_results = [
-                    r for r in results 
-                    if r.score is None or r.score >= min_score
-                ]
-            else:
-                filtered_results = results
-            
-            # Analyze results
-            analysis = self._analyze_results(filtered_results)
+            # Filter, serialize and analyze in a single pass
+            rows, analysis = self._filter_and_analyze(results, min_score)
             
             return {
                 "query": query,
                 "total_results": len(results),
-                "filtered_results": len(filtered_results),
-                "results": [r.to_dict() for r in filtered_results],
+                "filtered_results": len(rows),
+                "results": rows,
                 "analysis": analysis
             }
             
         except Exception as e:
             raise WebSearchError(f"Search with analysis failed: {e}")
     
-    def _analyze_results(self, results: List[SearchResult]) -> Dict[str, Any]:
+    def _filter_and_analyze(
+        self,
+        results: Iterable[SearchResult],
+        min_score: float = 0
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
-        Analyze search results to extract insights
+        Filter search results by score and analyze the survivors in one pass
         
         Args:
-            results: List of search results
+            results: Search results (any iterable, consumed once)
+            min_score: Minimum relevance score; unscored results are always kept
             
         Returns:
-            Analysis summary
+            The kept results as dicts, and an analysis summary of them
         """
-        if not results:
-            return {"summary": "No results found"}
+        rows: List[Dict[str, Any]] = []
+        domain_counts: Counter = Counter()
+        score_sum = 0.0
+        score_count = 0
+        has_recent = False
         
-        # Extract domains
-        domains = []
-        for result in results:
-            try:
-                from urllib.parse import urlparse
-                domain = urlparse(result.url).netloc
-                domains.append(domain)
-            except:
+        for r in results:
+            if min_score > 0 and r.score is not None and r.score < min_score:
                 continue
+            
+            rows.append(r.to_dict())
+            
+            # Non-http(s) URLs have no domain to count
+            m = _NETLOC_RE.match(r.url)
+            if m:
+                domain_counts[m.group(1)] += 1
+            
+            if r.score is not None:
+                score_sum += r.score
+                score_count += 1
+            
+            has_recent = has_recent or bool(r.age)
         
-        # Count domain frequency
-        domain_counts = {}
-        for domain in domains:
-            domain_counts[domain] = domain_counts.get(domain, 0) + 1
-        
-        # Get top domains
-        top_domains = sorted(domain_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Calculate average score if available
-        scores = [r.score for r in results if r.score is not None]
-        avg_score = sum(scores) / len(scores) if scores else None
+        if not rows:
+            return rows, {"summary": "No results found"}
         
-        return {
-            "total_results": len(results),
-            "top_domains": top_domains,
-            "average_score": avg_score,
-            "has_recent_results": any(r.age for r in results),
-            "summary": f"Found {len(results)} results from {len(set(domains))} unique domains"
+        return rows, {
+            "total_results": len(rows),
+            "top_domains": domain_counts.most_common(5),
+            "average_score": score_sum / score_count if score_count else None,
+            "has_recent_results": has_recent,
+            "summary": f"Found {len(rows)} results from {len(domain_counts)} unique domains"
         }
     
     async def close(self):
@@ -241,6 +362,49 @@ class WebSearchTool:
         await self.close()
 
 
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Get the running event loop, or None when called outside one"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _drop_closed_loop_tools() -> None:
+    """Forget tools whose event loop has closed; they can no longer be used or closed"""
+    for key in [key for key in _WEB_SEARCH_TOOL_CACHE if key[0] is not None and key[0].is_closed()]:
+        del _WEB_SEARCH_TOOL_CACHE[key]
+
+
+def get_web_search_tool(api_key: str) -> WebSearchTool:
+    """
+    Get the shared web search tool for an API key on the running loop, creating it on first use
+    
+    Args:
+        api_key: Brave Search API key
+        
+    Returns:
+        WebSearchTool whose HTTP connections are reused across calls
+    """
+    _drop_closed_loop_tools()
+    key = (_running_loop(), api_key)
+    tool = _WEB_SEARCH_TOOL_CACHE.get(key)
+    if tool is None:
+        tool = _WEB_SEARCH_TOOL_CACHE[key] = WebSearchTool(api_key)
+    return tool
+
+
+async def close_web_search_tools() -> None:
+    """Close every shared web search tool on the running loop; call once on application shutdown"""
+    _drop_closed_loop_tools()
+    loop = asyncio.get_running_loop()
+    keys = [key for key in _WEB_SEARCH_TOOL_CACHE if key[0] is loop or key[0] is None]
+    tools = [_WEB_SEARCH_TOOL_CACHE.pop(key) for key in keys]
+    
+    for tool in tools:
+        await tool.close()
+
+
 # Convenience function for simple searches
 async def search_web(
     api_key: str,
@@ -260,12 +424,12 @@ async def search_web(
     Returns:
         Search results with optional analysis
     """
-    async with WebSearchTool(api_key) as search_tool:
-        if analyze:
-            return await search_tool.search_with_analysis(query, count)
-        else:
-            results = await search_tool.search(query, count)
-            return {
-                "query": query,
-                "results": [r.to_dict() for r in results]
-            }
\ No newline at end of file
+    search_tool = get_web_search_tool(api_key)
+    if analyze:
+        return await search_tool.search_with_analysis(query, count)
+    else:
+        results = await search_tool.search(query, count)
+        return {
+            "query": query,
+            "results": [r.to_dict() for r in results]
+        }
\ No newline at end of file
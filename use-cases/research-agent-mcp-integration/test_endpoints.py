@@ -3,69 +3,96 @@
 Quick test to check what endpoints are available on deepify.org
 """
 
-import urllib.request
-import urllib.error
+import asyncio
 import json
+import socket
+import aiohttp
 
-def test_endpoint(url, method='GET'):
+# Bound every blocking socket operation, and every probe end-to-end, so one
+# hung server (e.g. a stalled TLS handshake) can't stall the whole sweep
+socket.setdefaulttimeout(10)
+PROBE_DEADLINE = 12
+
+BASE_URL = "https://deepify.org"
+
+# The initialize request never changes, so serialize it once at import time
+MCP_INIT_BODY = json.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {
+            "name": "test-client",
+            "version": "1.0.0"
+        }
+    }
+}).encode('utf-8')
+
+MCP_POST_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+async def probe_endpoint(session, name, path, method='GET'):
     """Test an endpoint and return status"""
+    url = f"{BASE_URL}{path}"
     try:
-        if method == 'POST':
-            # For MCP, we need to send a JSON request
-            data = json.dumps({
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {
-                        "name": "test-client",
-                        "version": "1.0.0"
-                    }
-                }
-            }).encode('utf-8')
-            
-            req = urllib.request.Request(
-                url, 
-                data=data,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                },
-                method=method
-            )
-        else:
-            req = urllib.request.Request(url, method=method)
-            
-        with urllib.request.urlopen(req, timeout=10) as response:
-            return f"✅ {response.status} {response.reason}"
-            
-    except urllib.error.HTTPError as e:
-        return f"❌ HTTP {e.code}: {e.reason}"
-    except urllib.error.URLError as e:
-        return f"❌ URL Error: {e.reason}"
+        # For MCP, we need to send a JSON request
+        data = MCP_INIT_BODY if method == 'POST' else None
+        headers = MCP_POST_HEADERS if method == 'POST' else None
+
+        async with session.request(
+            method,
+            url,
+            data=data,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as r:
+            r.raise_for_status()
+            return name, method, url, f"✅ {r.status} {r.reason}"
+
+    except aiohttp.ClientResponseError as e:
+        return name, method, url, f"❌ HTTP {e.status}: {e.message}"
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+        return name, method, url, f"❌ URL Error: {e!r}"
     except Exception as e:
-        return f"❌ Error: {str(e)}"
+        return name, method, url, f"❌ Error: {str(e)}"
 
-def main():
+async def main():
     print("🧪 Testing deepify.org endpoints")
     print("=" * 50)
-    
-    base_url = "https://deepify.org"
+
     endpoints = [
         ("Root", "/", "GET"),
-        ("MCP (GET)", "/mcp", "GET"), 
+        ("MCP (GET)", "/mcp", "GET"),
         ("MCP (POST)", "/mcp", "POST"),
         ("SSE", "/sse", "GET"),
         ("OAuth Authorize", "/authorize", "GET"),
         ("OAuth Token", "/token", "GET"),
         ("Register", "/register", "GET"),
     ]
-    
-    for name, path, method in endpoints:
-        url = f"{base_url}{path}"
-        print(f"{name:15} {method:4} {url:30} → {test_endpoint(url, method)}")
+
+    # All probes run concurrently over one pooled connector, so the sweep
+    # takes max(RTT) instead of sum(RTT)
+    connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        coros = [
+            asyncio.wait_for(probe_endpoint(session, name, path, method), timeout=PROBE_DEADLINE)
+            for name, path, method in endpoints
+        ]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+
+    results = [
+        (name, method, f"{BASE_URL}{path}", f"❌ Timed out after {PROBE_DEADLINE}s")
+        if isinstance(result, asyncio.TimeoutError) else
+        (name, method, f"{BASE_URL}{path}", f"❌ Error: {result}")
+        if isinstance(result, BaseException) else result
+        for (name, path, method), result in zip(endpoints, results)
+    ]
+    rows = [f"{n:15} {m:4} {u:30} → {s}" for (n, m, u, s) in results]
+    print("\n".join(rows))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -6,9 +6,12 @@ This tests against your LIVE MCP server deployed via GitHub Actions.
 Update PRODUCTION_MCP_URL with your actual Cloudflare Workers URL after deployment.
 """
 
+import asyncio
+import importlib.util
 import json
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
+from typing import Any, Dict, List, Tuple
+
+import httpx
 
 
 # 🔥 Your production MCP server at deepify.org
@@ -17,10 +20,25 @@ PRODUCTION_MCP_URL = "https://deepify.org/mcp"
 # Alternative worker URL if needed:
 # PRODUCTION_MCP_URL = "https://deepify-mcp-server.jakecusack.workers.dev/mcp"
 
+# Probes share one client; with h2 installed they multiplex over a single connection
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
-def test_live_mcp_server():
-    """Test connection to live production MCP server"""
-    
+# The tool discovery request never changes, so serialize it once at import time
+TOOLS_LIST_BODY = json.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "tools/list",
+    "params": {}
+}).encode('utf-8')
+
+MCP_POST_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'Research-Agent-Live-Test/1.0'
+}
+
+
+def _print_banner():
+    """Print the probe header"""
     print("🚀 Testing Live Research Agent + MCP Integration")
     print("=" * 60)
     print(f"🌐 Production MCP Server: {PRODUCTION_MCP_URL}")
@@ -29,86 +47,89 @@ def test_live_mcp_server():
     
     # Test 1: Basic connectivity
     print("1️⃣ Testing basic MCP server connectivity...")
+
+
+def _report_tools(result: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """Print the discovered tools and whether the integration set is present"""
+    print("✅ Successfully connected to production MCP server!")
     
-    try:
-        # MCP tool discovery request
-        mcp_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/list", 
-            "params": {}
-        }
+    if "result" in result and "tools" in result["result"]:
+        tools = result["result"]["tools"]
+        tool_names = [tool.get("name", "unknown") for tool in tools]
+        
+        print(f"📦 Available MCP tools ({len(tool_names)}):")
+        for tool in tool_names:
+            print(f"   - {tool}")
         
-        data = json.dumps(mcp_request).encode('utf-8')
-        request = Request(
-            PRODUCTION_MCP_URL,
-            data=data,
-            headers={
-                'Content-Type': 'application/json',
-                'User-Agent': 'Research-Agent-Live-Test/1.0'
-            },
-            method='POST'
-        )
+        # Check for research integration tools
+        integration_tools = ["parsePRP", "createTask", "listTasks", "createDocumentation"]
+        tool_set = set(tool_names)
+        found_tools = [tool for tool in integration_tools if tool in tool_set]
         
-        with urlopen(request, timeout=15) as response:
-            if response.status == 200:
-                result = json.loads(response.read().decode('utf-8'))
-                
-                print("✅ Successfully connected to production MCP server!")
-                
-                if "result" in result and "tools" in result["result"]:
-                    tools = result["result"]["tools"]
-                    tool_names = [tool.get("name", "unknown") for tool in tools]
-                    
-                    print(f"📦 Available MCP tools ({len(tool_names)}):")
-                    for tool in tool_names:
-                        print(f"   - {tool}")
-                    
-                    # Check for research integration tools
-                    integration_tools = ["parsePRP", "createTask", "listTasks", "createDocumentation"]
-                    found_tools = [tool for tool in integration_tools if tool in tool_names]
-                    
-                    print(f"\n🎯 Research Integration Tools Found ({len(found_tools)}/{len(integration_tools)}):")
-                    for tool in found_tools:
-                        print(f"   ✅ {tool}")
-                    
-                    missing_tools = [tool for tool in integration_tools if tool not in tool_names]
-                    if missing_tools:
-                        print(f"\n⚠️ Missing tools:")
-                        for tool in missing_tools:
-                            print(f"   ❌ {tool}")
-                    
-                    if len(found_tools) >= 3:
-                        print(f"\n🎉 MCP Server is ready for Research Agent integration!")
-                        return True, tool_names
-                    else:
-                        print(f"\n⚠️ MCP Server needs more tools for full integration")
-                        return False, tool_names
-                        
-                else:
-                    print("⚠️ Server responded but tool list format unexpected")
-                    print(f"Response: {result}")
-                    return False, []
-            else:
-                print(f"❌ HTTP Error {response.status}")
-                return False, []
-                
-    except HTTPError as e:
-        print(f"❌ HTTP Error {e.code}: {e.reason}")
-        if e.code == 404:
+        print(f"\n🎯 Research Integration Tools Found ({len(found_tools)}/{len(integration_tools)}):")
+        for tool in found_tools:
+            print(f"   ✅ {tool}")
+        
+        missing_tools = [tool for tool in integration_tools if tool not in tool_set]
+        if missing_tools:
+            print(f"\n⚠️ Missing tools:")
+            for tool in missing_tools:
+                print(f"   ❌ {tool}")
+        
+        if len(found_tools) >= 3:
+            print(f"\n🎉 MCP Server is ready for Research Agent integration!")
+            return True, tool_names
+        else:
+            print(f"\n⚠️ MCP Server needs more tools for full integration")
+            return False, tool_names
+            
+    else:
+        print("⚠️ Server responded but tool list format unexpected")
+        print(f"Response: {result}")
+        return False, []
+
+
+def _report_error(e: Exception) -> Tuple[bool, List[str]]:
+    """Print a failed probe with a troubleshooting tip"""
+    if isinstance(e, httpx.HTTPStatusError):
+        print(f"❌ HTTP Error {e.response.status_code}: {e.response.reason_phrase}")
+        if e.response.status_code == 404:
             print("💡 Tip: Check if your worker URL path is correct (/mcp)")
-        elif e.code == 401:
+        elif e.response.status_code == 401:
             print("💡 Tip: This might indicate OAuth is working (needs authentication)")
-        return False, []
-        
-    except URLError as e:
-        print(f"❌ Connection Error: {e.reason}")
+    elif isinstance(e, httpx.TransportError):
+        print(f"❌ Connection Error: {e!r}")
         print("💡 Tip: Check if your Cloudflare Workers URL is correct")
-        return False, []
-        
-    except Exception as e:
+    else:
         print(f"❌ Unexpected Error: {e}")
-        return False, []
+    return False, []
+
+
+async def probe_live_mcp_server(client: httpx.AsyncClient) -> Tuple[bool, List[str]]:
+    """Test connection to live production MCP server"""
+    
+    _print_banner()
+    
+    try:
+        response = await client.post(PRODUCTION_MCP_URL, content=TOOLS_LIST_BODY, headers=MCP_POST_HEADERS)
+        response.raise_for_status()
+        return _report_tools(response.json())
+    except Exception as e:
+        return _report_error(e)
+
+
+def probe_live_mcp_server_sync() -> Tuple[bool, List[str]]:
+    """Blocking variant of probe_live_mcp_server for one-off checks outside an event loop"""
+    
+    _print_banner()
+    
+    try:
+        with httpx.Client(timeout=15) as client:
+            response = client.post(PRODUCTION_MCP_URL, content=TOOLS_LIST_BODY, headers=MCP_POST_HEADERS)
+            response.raise_for_status()
+            return _report_tools(response.json())
+    except Exception as e:
+        return _report_error(e)
 
 
 def demo_expected_research_workflow():
@@ -150,10 +171,16 @@ def demo_expected_research_workflow():
     print(workflow_example)
 
 
+async def run_live_tests() -> Tuple[bool, List[str]]:
+    """Run the live probes over one shared client"""
+    async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=15) as client:
+        return await probe_live_mcp_server(client)
+
+
 def main():
     """Main test execution"""
     
-    success, tools = test_live_mcp_server()
+    success, tools = asyncio.run(run_live_tests())
     
     print("\n" + "="*60)
     
@@ -7,78 +7,34 @@ avoiding the need for local .env files entirely.
 """
 
 import sys
+import queue
 import asyncio
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from tools.mcp_client import MCPClient, MCPClientConfig
+from tools.mcp_client import MCPClientConfig
+from tools.mcp_convenience import get_shared_client, close_shared_clients
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Configure logging: records are queued and written to stderr by a background
+# thread, so output never blocks the event loop while requests are in flight
+_LOG_QUEUE: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_stderr_handler = logging.StreamHandler(sys.stderr)
+_stderr_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_LOG_LISTENER = QueueListener(_LOG_QUEUE, _stderr_handler)
+_queue_handler = QueueHandler(_LOG_QUEUE)
+# Only merge args here; the stderr handler applies the real format
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
+_ARCHITECTURE_BANNER = """
+🏗️ Complete Research Agent + MCP Integration Architecture
+============================================================
 
-async def test_production_mcp_server():
-    """Test connection to production MCP server deployed via GitHub Actions"""
-    
-    print("🚀 Testing Research Agent Integration with Production MCP Server")
-    print("=" * 70)
-    
-    # Your production MCP server URL (replace with your actual Cloudflare Workers URL)
-    PRODUCTION_MCP_URL = "https://your-worker-name.your-subdomain.workers.dev/mcp"
-    
-    print(f"🌐 Testing against production server: {PRODUCTION_MCP_URL}")
-    print("📡 This uses your GitHub Actions deployed MCP server with all secrets managed securely")
-    
-    # Configure MCP client for production
-    config = MCPClientConfig(
-        server_url=PRODUCTION_MCP_URL,
-        timeout=30
-        # No GitHub token needed for discovery - OAuth will handle auth for actual operations
-    )
-    
-    try:
-        print("\n1️⃣ Testing basic connectivity...")
-        async with MCPClient(config) as client:
-            # Test basic tool discovery (should work without auth)
-            tools = await client.discover_tools()
-            
-            print(f"✅ Successfully connected to production MCP server!")
-            print(f"📦 Available tools ({len(tools)}): {', '.join(tools)}")
-            
-            # Expected tools from your Deepify MCP server
-            expected_tools = ['parsePRP', 'createTask', 'listTasks', 'createDocumentation']
-            found_tools = [tool for tool in expected_tools if tool in tools]
-            
-            print(f"🎯 Core integration tools found: {', '.join(found_tools)}")
-            
-            if len(found_tools) >= 3:
-                print("✅ Production MCP server is ready for Research Agent integration!")
-                return True
-            else:
-                print("⚠️ Some expected tools not found - check MCP server deployment")
-                return False
-                
-    except Exception as e:
-        print(f"❌ Connection failed: {e}")
-        print("\n🔧 Troubleshooting:")
-        print("1. Verify your MCP server is deployed and accessible")
-        print("2. Check the production URL is correct")
-        print("3. Ensure GitHub Actions deployment completed successfully")
-        print("4. Test direct access: curl https://your-worker.workers.dev/health")
-        return False
-
-
-async def demo_research_workflow_architecture():
-    """Demonstrate the complete workflow architecture"""
-    
-    print("\n🏗️ Complete Research Agent + MCP Integration Architecture")
-    print("=" * 60)
-    
-    print("""
 📋 Workflow Overview:
 ┌─────────────────────────────────────────────────────────────┐
 │                                                             │
@@ -108,8 +64,83 @@ async def demo_research_workflow_architecture():
 1. Deploy MCP server (✅ DONE via GitHub Actions)
 2. Test integration against production server
 3. Run research workflows with real data
-4. Scale to multiple research agents
-""")
+4. Scale to multiple research agents (asyncio.gather their discover_tools calls)
+"""
+
+
+async def test_production_mcp_server():
+    """Test connection to production MCP server deployed via GitHub Actions"""
+    
+    logger.info("🚀 Testing Research Agent Integration with Production MCP Server")
+    
+    # Your production MCP server URL (replace with your actual Cloudflare Workers URL)
+    PRODUCTION_MCP_URL = "https://your-worker-name.your-subdomain.workers.dev/mcp"
+    
+    logger.info("🌐 Testing against production server: %s", PRODUCTION_MCP_URL)
+    logger.info("📡 This uses your GitHub Actions deployed MCP server with all secrets managed securely")
+    
+    # Configure MCP client for production
+    config = MCPClientConfig(
+        server_url=PRODUCTION_MCP_URL,
+        timeout=30
+        # No GitHub token needed for discovery - OAuth will handle auth for actual operations
+    )
+    
+    try:
+        logger.info("1️⃣ Testing basic connectivity...")
+        # Shared with any agent spawned later in this process, so they skip setup
+        client = await get_shared_client(config)
+        # Probe every endpoint at once so wall time is the slowest call, not the sum;
+        # a missing endpoint comes back as an exception instead of aborting the rest
+        tools, health, resources = await asyncio.gather(
+            client.discover_tools(),
+            client.ping_health(),
+            client.list_resources(),
+            return_exceptions=True
+        )
+        
+        if isinstance(tools, BaseException):
+            raise tools
+        
+        logger.info("✅ Successfully connected to production MCP server!")
+        logger.info("📦 Available tools (%d): %s", len(tools), ", ".join(tools))
+        logger.info("💓 Health check: %s", "ok" if health is True else f"unavailable ({health})")
+        if isinstance(resources, BaseException):
+            logger.warning("📚 Resources: unavailable (%s)", resources)
+        else:
+            logger.info("📚 Resources (%d)", len(resources))
+        
+        # Expected tools from your Deepify MCP server
+        expected_tools = ['parsePRP', 'createTask', 'listTasks', 'createDocumentation']
+        tool_set = set(tools)
+        found_tools = [tool for tool in expected_tools if tool in tool_set]
+        
+        logger.info("🎯 Core integration tools found: %s", ", ".join(found_tools))
+        
+        if len(found_tools) >= 3:
+            logger.info("✅ Production MCP server is ready for Research Agent integration!")
+            return True
+        else:
+            logger.warning("⚠️ Some expected tools not found - check MCP server deployment")
+            return False
+            
+    except Exception as e:
+        logger.error(
+            "❌ Connection failed: %s\n"
+            "🔧 Troubleshooting:\n"
+            "1. Verify your MCP server is deployed and accessible\n"
+            "2. Check the production URL is correct\n"
+            "3. Ensure GitHub Actions deployment completed successfully\n"
+            "4. Test direct access: curl https://your-worker.workers.dev/health",
+            e
+        )
+        return False
+
+
+async def demo_research_workflow_architecture():
+    """Demonstrate the complete workflow architecture"""
+    
+    logger.info(_ARCHITECTURE_BANNER)
 
 
 async def main():
@@ -117,25 +148,36 @@ async def main():
     
     await demo_research_workflow_architecture()
     
-    print("\n" + "="*70)
-    success = await test_production_mcp_server()
+    try:
+        success = await test_production_mcp_server()
+    finally:
+        await close_shared_clients()
     
     if success:
-        print("\n🎉 Integration Test Results:")
-        print("✅ Production MCP server is accessible")
-        print("✅ Core tools are available for research agent")
-        print("✅ Ready for full research-to-project workflows")
-        print("\n📋 Ready for Next Phase:")
-        print("- Add your production MCP server URL to the test")
-        print("- Configure research agent to use production server")
-        print("- Run end-to-end research workflows")
-        print("- All secrets stay secure in GitHub Actions! 🔐")
+        logger.info(
+            "🎉 Integration Test Results:\n"
+            "✅ Production MCP server is accessible\n"
+            "✅ Core tools are available for research agent\n"
+            "✅ Ready for full research-to-project workflows\n"
+            "📋 Ready for Next Phase:\n"
+            "- Add your production MCP server URL to the test\n"
+            "- Configure research agent to use production server\n"
+            "- Run end-to-end research workflows\n"
+            "- All secrets stay secure in GitHub Actions! 🔐"
+        )
     else:
-        print("\n⚠️ Integration test incomplete - check MCP server deployment")
+        logger.warning("⚠️ Integration test incomplete - check MCP server deployment")
     
-    print(f"\n💡 Key Insight: No .env files needed!")
-    print(f"   Your GitHub Actions approach handles ALL production secrets securely.")
+    logger.info(
+        "💡 Key Insight: No .env files needed!\n"
+        "   Your GitHub Actions approach handles ALL production secrets securely."
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    _LOG_LISTENER.start()
+    try:
+        asyncio.run(main())
+    finally:
+        # Drain queued records before the interpreter exits
+        _LOG_LISTENER.stop()
\ No newline at end of file
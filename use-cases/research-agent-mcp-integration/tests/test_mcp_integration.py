@@ -4,6 +4,9 @@ Basic tests for MCP integration functionality
 
 import pytest
 import asyncio
+import hashlib
+import json
+import time
 from unittest.mock import AsyncMock, MagicMock
 import sys
 from pathlib import Path
@@ -11,7 +14,15 @@ from pathlib import Path
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
-from tools.mcp_client import MCPClient, MCPClientConfig, MCPClientError
+from tools.mcp_client import (
+    MCPClient, MCPClientConfig, MCPClientError, MCPAuthenticationError, MCPServerError,
+    invalidate_tools, get_tools_cache_stats
+)
+from tools.mcp_batch import MCPCallQueue, call_tools_with_fallback
+from tools.mcp_convenience import (
+    create_task_via_mcp, create_tasks_via_mcp, create_documentation_via_mcp,
+    get_shared_client, close_shared_clients, get_shared_client_stats, get_project_status_via_mcp
+)
 from models.research_models import ResearchRequest
 from models.project_models import TaskPriority, DocumentationType
 
@@ -19,6 +30,18 @@ from models.project_models import TaskPriority, DocumentationType
 class TestMCPClient:
     """Test MCP client functionality"""
     
+    @pytest.fixture(autouse=True)
+    def clear_tools_cache(self, monkeypatch):
+        """Start every test with empty tool and client caches and no shared clients"""
+        invalidate_tools()
+        monkeypatch.setattr("tools.mcp_transport._SHARED_CLIENTS", {})
+        monkeypatch.setattr("tools.mcp_cache._TOOLS_CACHE_STATS", {"hits": 0, "misses": 0})
+        monkeypatch.setattr("tools.mcp_transport._BREAKERS", {})
+        monkeypatch.setattr("tools.mcp_convenience._CLIENT_CACHE", {})
+        monkeypatch.setattr("tools.mcp_convenience._CLIENT_CACHE_STATS", {"hits": 0, "misses": 0})
+        yield
+        invalidate_tools()
+    
     @pytest.fixture
     def mcp_config(self):
         """MCP client configuration for testing"""
@@ -29,10 +52,24 @@ class TestMCPClient:
         )
     
     @pytest.fixture
-    def mock_httpx_client(self):
-        """Mock httpx client for testing"""
-        client = AsyncMock()
-        return client
+    def mock_server(self, monkeypatch):
+        """Route the pooled HTTP client through an in-process httpx.MockTransport"""
+        import httpx
+        
+        real_client = httpx.AsyncClient
+        
+        def install(handler):
+            created = []
+            
+            def make_client(*args, **kwargs):
+                client = real_client(transport=httpx.MockTransport(handler), timeout=kwargs.get("timeout"))
+                created.append(client)
+                return client
+            
+            monkeypatch.setattr("httpx.AsyncClient", make_client)
+            return created
+        
+        return install
     
     def test_mcp_config_creation(self, mcp_config):
         """Test MCP configuration creation"""
@@ -41,11 +78,11 @@ class TestMCPClient:
         assert mcp_config.timeout == 10
     
     @pytest.mark.asyncio
-    async def test_tool_discovery_success(self, mcp_config, monkeypatch):
+    async def test_tool_discovery_success(self, mcp_config, mock_server):
         """Test successful tool discovery"""
-        # Mock successful response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        import httpx
+        
+        mock_server(lambda request: httpx.Response(200, json={
             "result": {
                 "tools": [
                     {"name": "parsePRP"},
@@ -53,92 +90,704 @@ class TestMCPClient:
                     {"name": "listTasks"}
                 ]
             }
+        }))
+        
+        async with MCPClient(mcp_config) as client:
+            tools = await client.discover_tools()
+        
+        assert tools == ["parsePRP", "createTask", "listTasks"]
+    
+    @pytest.mark.asyncio
+    async def test_tool_discovery_cached(self, mcp_config, mock_server):
+        """Test repeated tool discovery is served from the TTL cache"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"result": {"tools": [{"name": "parsePRP"}, {"name": "createTask"}]}})
+        
+        mock_server(handler)
+        
+        first = MCPClient(mcp_config)
+        second = MCPClient(mcp_config)
+        
+        assert await first.discover_tools() == ["parsePRP", "createTask"]
+        assert await second.discover_tools() == ["parsePRP", "createTask"]
+        assert len(requests) == 1
+        assert get_tools_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+        
+        invalidate_tools(mcp_config.server_url)
+        await second.discover_tools()
+        assert len(requests) == 2
+        
+        await first.discover_tools(force_refresh=True)
+        assert len(requests) == 3
+        
+        # Unknown tools are rejected locally once the tool list is cached
+        with pytest.raises(MCPClientError, match="not found"):
+            await first.call_tool("deleteEverything", {})
+        assert len(requests) == 3
+        
+        # Opting out of the cache always goes to the server
+        uncached = MCPClient(MCPClientConfig(server_url=mcp_config.server_url, use_tools_cache=False))
+        await uncached.discover_tools()
+        assert len(requests) == 4
+        
+        await first.close()
+        await second.close()
+        await uncached.close()
+    
+    @pytest.mark.asyncio
+    async def test_tool_schemas_cached_and_checked(self, mcp_config, mock_server):
+        """Test discovered schemas are served from cache and checked before sending"""
+        import httpx
+        
+        schema = {"type": "object", "properties": {"title": {"type": "string"}}, "required": ["title"]}
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"result": {"tools": [
+                {"name": "createTask", "description": "Create a task", "inputSchema": schema}
+            ]}})
+        
+        mock_server(handler)
+        
+        async with MCPClient(mcp_config) as client:
+            assert await client.discover_tools() == ["createTask"]
+            assert client.get_tool_schema("createTask")["inputSchema"] == schema
+            assert client.has_tool("createTask") and not client.has_tool("parsePRP")
+            
+            client.validate_args("createTask", {"title": "Test Task"})
+            with pytest.raises(MCPClientError, match="title"):
+                client.validate_args("createTask", {})
+            with pytest.raises(MCPClientError, match="Invalid arguments"):
+                await client.call_tool("createTask", {"description": "No title"})
+            with pytest.raises(MCPClientError, match="not been discovered"):
+                client.get_tool_schema("parsePRP")
+        
+        assert len(requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_http_client_shared_per_server(self, mcp_config, mock_server):
+        """Test clients for one server share a pooled HTTP client until the last closes"""
+        import httpx
+        
+        created = mock_server(lambda request: httpx.Response(200, json={"result": {}}))
+        
+        first = MCPClient(mcp_config)
+        second = MCPClient(mcp_config)
+        assert len(created) == 1
+        assert first.client is second.client
+        
+        await first.close()
+        await first.close()  # closing twice must not drop the other reference
+        assert not created[0].is_closed
+        
+        await second.close()
+        assert created[0].is_closed
+        
+        # Different timeouts or pool limits get their own client
+        third = MCPClient(mcp_config)
+        slow = MCPClient(MCPClientConfig(server_url=mcp_config.server_url, timeout=120))
+        assert third.client is not slow.client
+        await third.close()
+        await slow.close()
+    
+    @pytest.mark.asyncio
+    async def test_shared_client_reused_until_closed(self, mcp_config, mock_server):
+        """Test get_shared_client hands out one client per server and token"""
+        import httpx
+        
+        created = mock_server(lambda request: httpx.Response(200, json={"result": {}}))
+        
+        first = await get_shared_client(mcp_config)
+        second = await get_shared_client(mcp_config)
+        assert first is second
+        assert get_shared_client_stats() == {"hits": 1, "misses": 1, "size": 1}
+        
+        await close_shared_clients()
+        assert created[0].is_closed
+        assert await get_shared_client(mcp_config) is not first
+        await close_shared_clients()
+    
+    def test_shared_client_per_event_loop(self, mcp_config, mock_server):
+        """Test a new asyncio.run() gets a fresh client instead of one bound to a closed loop"""
+        import httpx
+        
+        mock_server(lambda request: httpx.Response(200, json={"result": {"tools": [{"name": "parsePRP"}]}}))
+        
+        async def discover():
+            client = await get_shared_client(mcp_config)
+            await client.discover_tools(force_refresh=True)
+            return client
+        
+        first = asyncio.run(discover())
+        second = asyncio.run(discover())
+        assert first is not second
+        assert first.client is not second.client
+        assert get_shared_client_stats()["size"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_shared_client_rejects_different_settings(self, mcp_config, mock_server):
+        """Test a second caller can't silently get a client built with other settings"""
+        import httpx
+        
+        mock_server(lambda request: httpx.Response(200, json={"result": {}}))
+        
+        await get_shared_client(mcp_config)
+        slower = MCPClientConfig(server_url=mcp_config.server_url, github_token="test_token", timeout=60)
+        with pytest.raises(MCPClientError, match="different settings"):
+            await get_shared_client(slower)
+        await close_shared_clients()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_probes_tolerate_missing_endpoint(self, mcp_config, mock_server):
+        """Test discovery, ping and resources/list run together and fail independently"""
+        import httpx
+        
+        def handler(request):
+            path = request.url.path
+            if path.endswith("/resources/list"):
+                return httpx.Response(404)
+            result = {"tools": [{"name": "parsePRP"}]} if path.endswith("/tools/list") else {}
+            return httpx.Response(200, json={"result": result})
+        
+        mock_server(handler)
+        
+        async with MCPClient(mcp_config) as client:
+            tools, health, resources = await asyncio.gather(
+                client.discover_tools(),
+                client.ping_health(),
+                client.list_resources(),
+                return_exceptions=True
+            )
+        
+        assert tools == ["parsePRP"]
+        assert health is True
+        assert isinstance(resources, MCPClientError)
+    
+    @pytest.mark.asyncio
+    async def test_tool_call_success(self, mcp_config, mock_server):
+        """Test successful tool call"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={
+                "result": {
+                    "content": [
+                        {"type": "text", "text": "Task created successfully"}
+                    ]
+                }
+            })
+        
+        mock_server(handler)
+        
+        async with MCPClient(mcp_config) as client:
+            result = await client.call_tool("createTask", {"title": "Test Task"})
+        
+        assert result["content"][0]["text"] == "Task created successfully"
+        assert len(requests) == 1
+        assert requests[0].url == f"{mcp_config.server_url}/tools/call"
+        assert requests[0].headers["Authorization"] == "Bearer test_token"
+        assert json.loads(requests[0].content) == {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": "createTask", "arguments": {"title": "Test Task"}}
         }
-        mock_response.raise_for_status.return_value = None
+    
+    @pytest.mark.asyncio
+    async def test_tool_error_keeps_server_error_type(self, mcp_config, mock_server):
+        """Test a JSON-RPC error surfaces as MCPServerError with its own message"""
+        import httpx
+        
+        mock_server(lambda request: httpx.Response(200, json={"error": {"message": "Project not found"}}))
+        
+        async with MCPClient(mcp_config) as client:
+            with pytest.raises(MCPServerError) as excinfo:
+                await client.call_tool("createTask", {"title": "Test Task"})
+        
+        assert str(excinfo.value) == "Tool 'createTask' failed: Project not found"
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("streamed", [False, True])
+    async def test_tool_call_stream(self, mcp_config, mock_server, monkeypatch, streamed):
+        """Test content blocks are yielded in order from a chunked response body"""
+        import httpx
+        
+        if streamed:
+            pytest.importorskip("ijson")
+        else:
+            monkeypatch.setattr("tools.mcp_client.ijson", None)
+        
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": [
+            {"type": "text", "text": f"Section {i} " + "x" * 200} for i in range(3)
+        ]}}).encode()
+        
+        async def chunks():
+            for start in range(0, len(body), 64):
+                yield body[start:start + 64]
+        
+        mock_server(lambda request: httpx.Response(200, content=chunks()))
+        
+        async with MCPClient(mcp_config) as client:
+            blocks = [block async for block in client.call_tool_stream("parsePRP", {"prpContent": "# PRP"})]
+        
+        assert [block["text"][:9] for block in blocks] == ["Section 0", "Section 1", "Section 2"]
         
-        mock_client = AsyncMock()
-        mock_client.post.return_value = mock_response
-        mock_client.aclose = AsyncMock()
+        mock_server(lambda request: httpx.Response(200, json={"error": {"message": "Bad PRP"}}))
+        async with MCPClient(mcp_config) as client:
+            with pytest.raises(MCPClientError, match="Bad PRP"):
+                async for _ in client.call_tool_stream("parsePRP", {"prpContent": ""}):
+                    pass
+    
+    @pytest.mark.asyncio
+    async def test_tool_result_cached(self, mcp_config, mock_server):
+        """Test identical read-only calls are served from the opt-in result cache"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"result": {"content": [{"type": "text", "text": "2 tasks"}]}})
+        
+        mock_server(handler)
+        
+        client = MCPClient(MCPClientConfig(server_url=mcp_config.server_url, use_tool_cache=True))
+        
+        first = await client.call_tool("listTasks", {"projectName": "demo", "limit": 10})
+        second = await client.call_tool("listTasks", {"limit": 10, "projectName": "demo"})
+        assert first == second
+        assert len(requests) == 1
+        
+        # Different arguments, an explicit opt-out and write tools all go to the server
+        await client.call_tool("listTasks", {"projectName": "other"})
+        await client.call_tool("listTasks", {"projectName": "demo", "limit": 10}, cache=False)
+        await client.call_tool("createTask", {"title": "Task"})
+        await client.call_tool("createTask", {"title": "Task"})
+        assert len(requests) == 5
+        
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_tool_result_cache_hints(self, mcp_config, mock_server):
+        """Test the server's _meta.cache_hint disables caching or sets the entry TTL"""
+        import httpx
+        
+        requests = []
+        hints = {"demo": "no-cache", "other": {"ttl": 30}}
         
-        # Patch httpx.AsyncClient
-        def mock_async_client(*args, **kwargs):
-            return mock_client
+        def handler(request):
+            requests.append(request)
+            project = json.loads(request.content)["params"]["arguments"]["projectName"]
+            return httpx.Response(200, json={"result": {
+                "content": [{"type": "text", "text": "2 tasks"}],
+                "_meta": {"cache_hint": hints[project]}
+            }})
         
-        monkeypatch.setattr("httpx.AsyncClient", mock_async_client)
+        mock_server(handler)
+        
+        config = MCPClientConfig(server_url=mcp_config.server_url, use_tool_cache=True)
+        async with MCPClient(config) as client:
+            await client.call_tool("listTasks", {"projectName": "demo"})
+            await client.call_tool("listTasks", {"projectName": "demo"})
+            assert len(requests) == 2
+            
+            await client.call_tool("listTasks", {"projectName": "other"})
+            await client.call_tool("listTasks", {"projectName": "other"})
+            assert len(requests) == 3
+            
+            # The hinted TTL bounds the entry; once it lapses the call goes out again
+            key = client._tool_cache_key("listTasks", {"projectName": "other"})
+            expires_at, result = client._tool_cache[key]
+            assert 29 < expires_at - time.monotonic() <= 30
+            client._tool_cache[key] = (time.monotonic() - 1, result)
+            await client.call_tool("listTasks", {"projectName": "other"})
+            assert len(requests) == 4
+    
+    @pytest.mark.asyncio
+    async def test_idempotent_tool_retried(self, mcp_config, mock_server, monkeypatch):
+        """Test read-only tools are retried after a transport error, writes are not"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            # Every other request has its connection reset
+            if len(requests) % 2:
+                raise httpx.ReadError("connection reset", request=request)
+            return httpx.Response(200, json={"result": {"content": []}})
+        
+        mock_server(handler)
+        monkeypatch.setattr("tools.mcp_transport._RETRY_BASE_DELAY", 0)
         
-        # Test tool discovery
         client = MCPClient(mcp_config)
-        tools = await client.discover_tools()
+        result = await client.call_tool("listTasks", {"projectName": "Test Project"})
+        assert result == {"content": []}
+        assert len(requests) == 2
         
-        assert len(tools) == 3
-        assert "parsePRP" in tools
-        assert "createTask" in tools
-        assert "listTasks" in tools
+        with pytest.raises(MCPClientError):
+            await client.call_tool("createTask", {"title": "Test Task"})
+        assert len(requests) == 3
         
         await client.close()
     
     @pytest.mark.asyncio
-    async def test_tool_call_success(self, mcp_config, monkeypatch):
-        """Test successful tool call"""
-        # Mock successful response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "result": {
-                "content": [
-                    {"type": "text", "text": "Task created successfully"}
-                ]
-            }
-        }
-        mock_response.raise_for_status.return_value = None
+    async def test_tool_batch_call(self, mcp_config, mock_server):
+        """Test batched tool calls are sent in one request and returned in order"""
+        import httpx
         
-        mock_client = AsyncMock()
-        mock_client.post.return_value = mock_response
-        mock_client.aclose = AsyncMock()
+        bodies = []
         
-        def mock_async_client(*args, **kwargs):
-            return mock_client
+        def handler(request):
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": 1, "error": {"message": "Unknown tool"}},
+                {"jsonrpc": "2.0", "id": 0, "result": {"content": [{"text": "3 tasks"}]}}
+            ])
         
-        monkeypatch.setattr("httpx.AsyncClient", mock_async_client)
+        mock_server(handler)
         
-        # Test tool call
         client = MCPClient(mcp_config)
-        result = await client.call_tool("createTask", {"title": "Test Task"})
+        calls = [
+            ("listTasks", {"projectName": "Test Project"}),
+            ("listDocumentation", {"projectName": "Test Project"})
+        ]
+        results = await client.call_tools_batch(calls, return_exceptions=True)
         
-        assert "content" in result
-        assert result["content"][0]["text"] == "Task created successfully"
+        assert len(bodies) == 1
+        assert len(bodies[0]) == 2
+        assert results[0]["content"][0]["text"] == "3 tasks"
+        assert isinstance(results[1], MCPClientError)
+        
+        with pytest.raises(MCPClientError, match="listDocumentation"):
+            await client.call_tools_batch(calls)
         
         await client.close()
     
     @pytest.mark.asyncio
-    async def test_authentication_error(self, mcp_config, monkeypatch):
-        """Test authentication error handling"""
-        # Mock 401 response
-        from httpx import HTTPStatusError, Request, Response
+    async def test_bulk_task_creation_single_request(self, mcp_config, mock_server):
+        """Test creating a known task list costs one HTTP round trip"""
+        import httpx
         
-        mock_response = MagicMock()
-        mock_response.status_code = 401
-        mock_response.raise_for_status.side_effect = HTTPStatusError(
-            "401 Unauthorized",
-            request=Request("POST", "http://test"),
-            response=Response(401)
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            batch = json.loads(request.content)
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": call["id"], "result": {"title": call["params"]["arguments"]["title"]}}
+                for call in reversed(batch)
+            ])
+        
+        mock_server(handler)
+        
+        tasks = [
+            {"title": f"Task {i}", "description": "Bulk", "project_name": "Test Project"}
+            for i in range(5)
+        ]
+        async with MCPClient(mcp_config) as client:
+            results = await create_tasks_via_mcp(client, tasks)
+        
+        assert len(requests) == 1
+        assert [result["title"] for result in results] == [f"Task {i}" for i in range(5)]
+    
+    @pytest.mark.asyncio
+    async def test_batch_falls_back_to_single_calls(self, mcp_config, mock_server):
+        """Test servers without batch support still get every call, one at a time"""
+        import httpx
+        
+        bodies = []
+        
+        def handler(request):
+            body = json.loads(request.content)
+            bodies.append(body)
+            if isinstance(body, list):
+                return httpx.Response(200, json={"error": {"message": "Batch requests not supported"}})
+            if body["params"]["name"] == "listDocumentation":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"result": {"content": [{"text": "3 tasks"}]}})
+        
+        mock_server(handler)
+        
+        calls = [
+            ("listTasks", {"projectName": "Test Project"}),
+            ("listDocumentation", {"projectName": "Test Project"})
+        ]
+        async with MCPClient(mcp_config) as client:
+            tasks_result, docs_result = await call_tools_with_fallback(client, calls)
+            assert tasks_result["content"][0]["text"] == "3 tasks"
+            assert isinstance(docs_result, MCPClientError)
+            assert [isinstance(body, list) for body in bodies] == [True, False, False]
+            
+            # A lone call is never wrapped in a batch array
+            await call_tools_with_fallback(client, calls[:1])
+            assert isinstance(bodies[-1], dict)
+    
+    @pytest.mark.asyncio
+    async def test_call_queue_batches_same_tick(self, mcp_config, mock_server):
+        """Test calls queued in the same tick are sent as one batch"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": 0, "result": {"content": [{"text": "Task created"}]}},
+                {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"text": "Doc created"}]}}
+            ])
+        
+        mock_server(handler)
+        
+        client = MCPClient(mcp_config)
+        queue = MCPCallQueue(client)
+        task_result, doc_result = await asyncio.gather(
+            queue.add("createTask", {"title": "Test Task"}),
+            queue.add("createDocumentation", {"title": "Test Doc"})
         )
         
-        mock_client = AsyncMock()
-        mock_client.post.return_value = mock_response
-        mock_client.aclose = AsyncMock()
+        assert len(requests) == 1
+        assert task_result["content"][0]["text"] == "Task created"
+        assert doc_result["content"][0]["text"] == "Doc created"
+        
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_project_status_without_documentation_tool(self, mcp_config, mock_server):
+        """Test the stand-in documentation result is a fresh copy on every call"""
+        import httpx
+        
+        def handler(request):
+            if json.loads(request.content)["params"]["name"] == "listDocumentation":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"result": {"content": [{"type": "text", "text": "0 tasks"}]}})
         
-        def mock_async_client(*args, **kwargs):
-            return mock_client
+        mock_server(handler)
         
-        monkeypatch.setattr("httpx.AsyncClient", mock_async_client)
+        async with MCPClient(mcp_config) as client:
+            first = await get_project_status_via_mcp(client, "demo")
+            first["documentation"]["content"].clear()
+            second = await get_project_status_via_mcp(client, "demo")
+        
+        assert second["documentation"] == {"content": [{"text": "Documentation listing not available"}]}
+    
+    @pytest.mark.asyncio
+    async def test_tool_result_as_model(self, mcp_config, mock_server):
+        """Test the JSON payload of a tool result is built into a response model"""
+        import httpx
+        from models.project_models import Task, TaskStatus
+        
+        payload = {
+            "title": "Test Task",
+            "description": "Test description",
+            "project_name": "test-project",
+            "created_by": "testuser"
+        }
+        mock_server(lambda request: httpx.Response(200, json={
+            "result": {"content": [{"type": "text", "text": json.dumps(payload)}], "isError": False}
+        }))
         
-        # Test authentication error
         client = MCPClient(mcp_config)
+        task = await create_task_via_mcp(
+            client,
+            title="Test Task",
+            description="Test description",
+            project_name="test-project",
+            response_model=Task
+        )
         
-        with pytest.raises(Exception):  # Should raise MCPAuthenticationError
-            await client.discover_tools()
+        assert isinstance(task, Task)
+        assert task.title == "Test Task"
+        assert task.status == TaskStatus.TODO  # defaults still applied
         
         await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_invalid_task_arguments_rejected_locally(self, mcp_config, mock_server):
+        """Test that malformed createTask arguments never reach the server"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"result": {"content": []}})
+        
+        mock_server(handler)
+        
+        client = MCPClient(mcp_config)
+        with pytest.raises(MCPClientError, match="Invalid arguments for createTask"):
+            await create_task_via_mcp(
+                client,
+                title="Test Task",
+                description="Test description",
+                project_name="test-project",
+                priority="urgent",
+                estimated_hours=-1
+            )
+        
+        assert requests == []
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_circuit_opens_after_consecutive_failures(self, mcp_config, mock_server):
+        """Test repeated connection failures trip the breaker so later calls fail fast"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            raise httpx.ConnectError("Connection refused", request=request)
+        
+        mock_server(handler)
+        
+        async with MCPClient(mcp_config) as client:
+            for _ in range(3):
+                with pytest.raises(MCPClientError, match="Connection error"):
+                    await client.discover_tools()
+            assert len(requests) == 3
+            
+            with pytest.raises(MCPClientError, match="Circuit open"):
+                await client.discover_tools()
+            assert len(requests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_circuit_counts_server_errors_across_clients(self, mcp_config, mock_server):
+        """Test 5xx responses trip the breaker for every client of the same server"""
+        import httpx
+        
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(503, json={"error": {"message": "Service unavailable"}})
+        
+        mock_server(handler)
+        
+        for _ in range(3):
+            async with MCPClient(mcp_config) as client:
+                with pytest.raises(MCPClientError):
+                    await client.call_tool("listTasks", {})
+        assert len(requests) == 3
+        
+        async with MCPClient(mcp_config) as client:
+            with pytest.raises(MCPClientError, match="^Circuit open"):
+                await client.call_tool("listTasks", {})
+        assert len(requests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_content_hash_only_sent_when_declared(self, mcp_config, mock_server):
+        """Test contentSha256 is left out unless the server's schema accepts it"""
+        import httpx
+        
+        sent = []
+        properties = {"title": {"type": "string"}, "content": {"type": "string"}}
+        
+        def handler(request):
+            body = json.loads(request.content)
+            if body["method"] == "tools/list":
+                return httpx.Response(200, json={"result": {"tools": [{
+                    "name": "createDocumentation",
+                    "inputSchema": {"type": "object", "properties": properties}
+                }]}})
+            sent.append(body["params"]["arguments"])
+            return httpx.Response(200, json={"result": {"content": []}})
+        
+        mock_server(handler)
+        
+        async with MCPClient(mcp_config) as client:
+            await create_documentation_via_mcp(client, "Guide", "Body", "guide", "Test Project")
+            await client.discover_tools()
+            await create_documentation_via_mcp(client, "Guide", "Body", "guide", "Test Project")
+            
+            properties["contentSha256"] = {"type": "string"}
+            await client.discover_tools(force_refresh=True)
+            await create_documentation_via_mcp(client, "Guide", "Body", "guide", "Test Project")
+        
+        assert ["contentSha256" in arguments for arguments in sent] == [False, False, True]
+        assert sent[2]["contentSha256"] == hashlib.sha256(b"Body").hexdigest()
+    
+    @pytest.mark.asyncio
+    async def test_authentication_error(self, mcp_config, mock_server):
+        """Test authentication error handling"""
+        import httpx
+        
+        mock_server(lambda request: httpx.Response(401))
+        
+        async with MCPClient(mcp_config) as client:
+            with pytest.raises(MCPAuthenticationError):
+                await client.discover_tools()
+
+class TestWebSearchTool:
+    """Test web search tool functionality"""
+    
+    @pytest.mark.asyncio
+    async def test_repeated_search_served_from_cache(self):
+        """Test that an identical search within the TTL skips the API"""
+        from tools.web_search import WebSearchTool
+        
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({
+            "web": {"results": [{"title": "Result", "url": "https://example.com", "description": "Desc"}]}
+        }).encode()
+        mock_response.raise_for_status.return_value = None
+        
+        tool = WebSearchTool("test-key")
+        await tool.client.aclose()
+        tool.client = AsyncMock()
+        tool.client.get.return_value = mock_response
+        
+        first = await tool.search("fastapi", count=5)
+        second = await tool.search("fastapi", count=5)
+        await tool.search("fastapi", count=5, freshness="pw")
+        
+        assert [r.url for r in first] == [r.url for r in second] == ["https://example.com"]
+        assert tool.client.get.call_count == 2  # different params are a different entry
+    
+    def test_shared_tool_per_event_loop(self, monkeypatch):
+        """Test a new asyncio.run() gets a fresh tool instead of one bound to a closed loop"""
+        from tools.web_search import get_web_search_tool, close_web_search_tools
+        
+        cache = {}
+        monkeypatch.setattr("tools.web_search._WEB_SEARCH_TOOL_CACHE", cache)
+        
+        async def get_tool():
+            tool = get_web_search_tool("test-key")
+            assert get_web_search_tool("test-key") is tool
+            return tool
+        
+        first = asyncio.run(get_tool())
+        second = asyncio.run(get_tool())
+        assert first is not second
+        assert len(cache) == 1
+        
+        asyncio.run(close_web_search_tools())
+        assert cache == {}
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_is_per_second(self):
+        """Test the limiter only lets one second's budget through as a burst"""
+        from tools.web_search import WebSearchTool
+        
+        tool = WebSearchTool("test-key", requests_per_second=5)
+        await tool.client.aclose()
+        
+        start = time.monotonic()
+        for _ in range(6):
+            await tool._limiter.acquire()
+        
+        # The sixth acquire waits for capacity to leak back (~0.2s at 5/s)
+        assert time.monotonic() - start >= 0.1
 
 
 class TestResearchModels:
@@ -209,6 +858,26 @@ class TestProjectModels:
         assert doc.title == "Test Doc"
         assert doc.type == DocumentationType.GUIDE
         assert doc.importance == DocumentationImportance.HIGH
+        assert doc.content_sha256 == hashlib.sha256(b"Test content").hexdigest()
+    
+    def test_create_task_request_json_bytes(self):
+        """Test request models dump straight to camelCase tool arguments"""
+        from models.project_models import CreateTaskRequest
+        
+        request = CreateTaskRequest(
+            title="Test Task",
+            description="Test description",
+            project_name="test-project",
+            priority=TaskPriority.HIGH
+        )
+        
+        assert json.loads(request.to_json_bytes()) == {
+            "title": "Test Task",
+            "description": "Test description",
+            "projectName": "test-project",
+            "priority": "high",
+            "tags": []
+        }
 
 
 # Integration test (requires running MCP server)
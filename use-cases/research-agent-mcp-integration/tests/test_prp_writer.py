@@ -0,0 +1,266 @@
+"""
+Tests for PRP writer prompt building and generation
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from tools.prp_writer import PRPWriter, ResearchInput, PRPWriterError, _get_shared_client, close_anthropic_clients
+from tools.prp_batch import BatchPRPWriter
+from tools.prp_prompts import _PRP_SECTIONS
+
+
+_USAGE = SimpleNamespace(cache_read_input_tokens=0, cache_creation_input_tokens=0)
+
+
+class StubStream:
+    """Stands in for the SDK's message stream context manager"""
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            yield chunk
+    
+    async def get_final_message(self):
+        return SimpleNamespace(usage=_USAGE)
+
+
+class StubBatches:
+    """Stands in for client.beta.messages.batches, finishing every batch at once"""
+    
+    def __init__(self, failed=()):
+        self.failed = set(failed)
+        self.requests = []
+    
+    async def create(self, requests, betas):
+        self.requests = requests
+        return SimpleNamespace(id="batch-1", processing_status="ended")
+    
+    async def retrieve(self, batch_id):
+        return SimpleNamespace(id=batch_id, processing_status="ended")
+    
+    async def results(self, batch_id):
+        async def entries():
+            # Results come back in completion order, not submission order
+            for request in reversed(self.requests):
+                custom_id = request["custom_id"]
+                if custom_id in self.failed:
+                    yield SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="errored"))
+                else:
+                    message = SimpleNamespace(content=[SimpleNamespace(text=f"PRP for {custom_id}\n")])
+                    yield SimpleNamespace(
+                        custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message)
+                    )
+        return entries()
+
+
+class StubMessages:
+    """Records the requests sent to client.messages and returns canned text"""
+    
+    def __init__(self, chunks=("# PRP", "\nBody\n")):
+        self.chunks = chunks
+        self.stream_calls = []
+        self.create_calls = []
+    
+    def stream(self, **kwargs):
+        self.stream_calls.append(kwargs)
+        return StubStream(self.chunks)
+    
+    async def create(self, **kwargs):
+        self.create_calls.append(kwargs)
+        section = kwargs["messages"][0]["content"].split("**")[1]
+        return SimpleNamespace(content=[SimpleNamespace(text=f" {section} body \n")], usage=_USAGE)
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    """Anthropic client stub installed in place of the shared SDK client"""
+    client = SimpleNamespace(
+        messages=StubMessages(),
+        beta=SimpleNamespace(messages=SimpleNamespace(batches=StubBatches()))
+    )
+    monkeypatch.setattr("tools.prp_writer._get_shared_client", lambda api_key: client)
+    return client
+
+
+@pytest.fixture
+def writer(stub_client):
+    """PRP writer with small limits so truncation and capping are easy to hit"""
+    return PRPWriter(anthropic_api_key="test_key", max_desc_chars=10, max_results=2)
+
+
+@pytest.fixture
+def batch_writer(stub_client):
+    """Batch-capable PRP writer on the stubbed client"""
+    return BatchPRPWriter(anthropic_api_key="test_key", max_desc_chars=10, max_results=2)
+
+
+@pytest.fixture
+def research_input():
+    """Research input with one duplicate URL and one long description"""
+    return ResearchInput(
+        topic="FastAPI microservices",
+        research_results=[
+            {"url": "https://a.example.com", "title": "First", "description": "Short"},
+            {"url": "https://a.example.com", "title": "Duplicate", "description": "Same page again"},
+            {"url": "https://b.example.com", "title": "Second", "description": "A description that runs long"},
+            {"url": "https://c.example.com", "title": "Third", "description": "Over the cap"}
+        ],
+        project_goals=["Ship an MVP"],
+        timeline="2 weeks"
+    )
+
+
+class TestFormatResearchResults:
+    """Test how research results are rendered into the prompt"""
+    
+    def test_keeps_search_relevance_order(self, writer):
+        """Test the best hit stays Source 1 even when its URL sorts last"""
+        formatted = writer._format_research_results([
+            {"url": "https://z.example.com", "title": "Best", "description": "Top hit"},
+            {"url": "https://a.example.com", "title": "Second", "description": "Runner up"}
+        ])
+        
+        assert "### Source 1: Best" in formatted
+        assert "### Source 2: Second" in formatted
+    
+    def test_dedupes_truncates_and_caps(self, writer, research_input):
+        """Test repeated URLs are dropped, long snippets cut and the count capped"""
+        formatted = writer._format_research_results(research_input.research_results)
+        
+        assert "Duplicate" not in formatted
+        assert "**Key Points:** A descript…" in formatted
+        assert "**Key Points:** Short\n" in formatted
+        assert "Third" not in formatted
+        assert formatted.count("### Source") == 2
+    
+    def test_empty_results(self, writer):
+        """Test an empty result list gets a placeholder instead of an empty section"""
+        assert writer._format_research_results([]) == "No specific research results provided."
+
+
+class TestSharedClient:
+    """Test the shared Anthropic client cache"""
+    
+    def test_client_per_event_loop(self, monkeypatch):
+        """Test a new asyncio.run() gets a fresh client instead of one bound to a closed loop"""
+        cache = {}
+        monkeypatch.setattr("tools.prp_writer._ANTHROPIC_CLIENTS", cache)
+        
+        async def get_client(close):
+            client = _get_shared_client("test_key")
+            assert _get_shared_client("test_key") is client
+            if close:
+                await close_anthropic_clients()
+            return client
+        
+        first = asyncio.run(get_client(close=False))
+        second = asyncio.run(get_client(close=True))
+        assert first is not second
+        assert cache == {}
+    
+    def test_limits_per_event_loop(self, writer, monkeypatch):
+        """Test a writer reused across asyncio.run() calls gets limits bound to the current loop"""
+        limits = {}
+        monkeypatch.setattr("tools.prp_writer._ANTHROPIC_LIMITS", limits)
+        
+        async def get_limits():
+            assert writer._sem is writer._sem
+            return writer._sem, writer._limiter
+        
+        first = asyncio.run(get_limits())
+        second = asyncio.run(get_limits())
+        assert first[0] is not second[0] and first[1] is not second[1]
+        assert len(limits) == 1
+
+
+class TestPRPGeneration:
+    """Test PRP generation against a stubbed Anthropic client"""
+    
+    def test_prompt_puts_cached_instructions_first(self, writer, research_input):
+        """Test the invariant instructions lead and carry the cache marker"""
+        static, dynamic = writer._build_prp_prompt(research_input)
+        
+        assert static["cache_control"] == {"type": "ephemeral"}
+        assert static["text"] == writer._static_prp_template()
+        assert "cache_control" not in dynamic
+        assert "FastAPI microservices" in dynamic["text"]
+        assert "**Project Goals:** Ship an MVP" in dynamic["text"]
+        assert "FastAPI microservices" not in static["text"]
+    
+    @pytest.mark.asyncio
+    async def test_stream_yields_chunks(self, writer, stub_client, research_input):
+        """Test streamed chunks reach both the caller and the progress callback"""
+        seen = []
+        chunks = [chunk async for chunk in writer.write_prp_from_research_stream(research_input, seen.append)]
+        
+        assert chunks == ["# PRP", "\nBody\n"]
+        assert seen == chunks
+        
+        request = stub_client.messages.stream_calls[0]
+        assert request["stop_sequences"] == ["---END---"]
+        assert request["messages"][0]["content"] == writer._build_prp_prompt(research_input)
+    
+    @pytest.mark.asyncio
+    async def test_write_prp_joins_stream(self, writer, research_input):
+        """Test the non-streaming call returns the joined, right-stripped text"""
+        assert await writer.write_prp_from_research(research_input) == "# PRP\nBody"
+    
+    @pytest.mark.asyncio
+    async def test_stream_errors_wrapped(self, writer, stub_client, research_input):
+        """Test SDK failures surface as PRPWriterError"""
+        def fail(**kwargs):
+            raise RuntimeError("overloaded")
+        
+        stub_client.messages.stream = fail
+        with pytest.raises(PRPWriterError, match="overloaded"):
+            await writer.write_prp_from_research(research_input)
+    
+    @pytest.mark.asyncio
+    async def test_batch_returns_input_order(self, batch_writer, stub_client, research_input):
+        """Test batch results are matched back to their inputs regardless of completion order"""
+        other = ResearchInput(topic="Rust web frameworks", research_results=[])
+        
+        prps = await batch_writer.write_prp_batch([research_input, other], poll_interval=0)
+        
+        assert prps == ["PRP for prp-0", "PRP for prp-1"]
+        requests = stub_client.beta.messages.batches.requests
+        assert requests[1]["params"]["messages"][0]["content"] == batch_writer._build_prp_prompt(other)
+        assert await batch_writer.write_prp_batch([]) == []
+    
+    @pytest.mark.asyncio
+    async def test_batch_reports_failed_requests(self, batch_writer, stub_client, research_input):
+        """Test a batch with failed entries raises instead of returning partial PRPs"""
+        stub_client.beta.messages.batches.failed = {"prp-1"}
+        
+        with pytest.raises(PRPWriterError, match="prp-1"):
+            await batch_writer.write_prp_batch([research_input, research_input], poll_interval=0)
+    
+    @pytest.mark.asyncio
+    async def test_sectioned_prp(self, batch_writer, stub_client, research_input):
+        """Test one request per section, assembled in section order with a shared system prompt"""
+        prp = await batch_writer.write_prp_sectioned(research_input)
+        
+        calls = stub_client.messages.create_calls
+        assert len(calls) == len(_PRP_SECTIONS)
+        assert all(call["system"] == calls[0]["system"] for call in calls)
+        assert calls[0]["system"][1]["cache_control"] == {"type": "ephemeral"}
+        
+        headings = [line for line in prp.splitlines() if line.startswith("## ")]
+        assert headings == [f"## {i}. {name}" for i, (name, _) in enumerate(_PRP_SECTIONS, 1)]
+        assert "## 1. Project Overview\n\nProject Overview body" in prp
@@ -0,0 +1,51 @@
+"""
+Tests for the setup script's .env checks
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# Load setup.py by path; "setup" would otherwise resolve to an installed module
+_spec = importlib.util.spec_from_file_location(
+    "research_setup", Path(__file__).parent.parent / "setup.py"
+)
+research_setup = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(research_setup)
+
+
+class TestCheckApiKeys:
+    """Test .env parsing in check_api_keys"""
+    
+    @pytest.fixture
+    def env_dir(self, tmp_path, monkeypatch):
+        """Run the check in an empty directory"""
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+    
+    def test_empty_assignment_does_not_swallow_next_line(self, env_dir):
+        """Test an empty KEY= line leaves the following assignment intact"""
+        env = "BRAVE_API_KEY=\nANTHROPIC_API_KEY=sk-123\nMCP_SERVER_URL=http://localhost:8787/mcp\n"
+        
+        found = dict(research_setup.ENV_ASSIGNMENT_RE.findall(env))
+        assert found["BRAVE_API_KEY"] == ""
+        assert found["ANTHROPIC_API_KEY"] == "sk-123"
+    
+    def test_reports_only_missing_keys(self, env_dir, capsys):
+        """Test only the empty key is reported missing"""
+        (env_dir / ".env").write_text(
+            "BRAVE_API_KEY=\nANTHROPIC_API_KEY=sk-123\nMCP_SERVER_URL=http://localhost:8787/mcp\n"
+        )
+        
+        assert research_setup.check_api_keys() is False
+        assert "Missing or incomplete configuration for: BRAVE_API_KEY\n" in capsys.readouterr().out
+    
+    def test_complete_env_passes(self, env_dir):
+        """Test a fully configured .env passes and records the validated marker"""
+        (env_dir / ".env").write_text(
+            "BRAVE_API_KEY = brv-1\nANTHROPIC_API_KEY=sk-123\nMCP_SERVER_URL=http://localhost:8787/mcp\n"
+        )
+        
+        assert research_setup.check_api_keys() is True
+        assert (env_dir / ".env.validated").exists()